@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import logging
+import argparse
+import statistics
+from pathlib import Path
+from time import perf_counter
+
+# set up path for project root directory
+sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    from core.db.db import DB
+except ImportError as ie:
+    exit(f'failed to import DB module:: {ie}')
+
+BENCH_TABLE = 'public.db_pool_benchmark'
+
+
+def get_default_dsn():
+    """
+    Build connection link from settings/db.json
+    :return:
+    """
+    path = os.path.join(str(Path(__file__).parent.parent), 'settings', 'db.json')
+    with open(path) as f:
+        config = json.load(f)
+    return 'postgresql://{user}:{pwd}@{host}:{port}/{db}'.format(**config)
+
+
+def run_mode(dsn, use_pool, calls, batch_size, logger):
+    """
+    Measure per-call latency of small save_batch calls
+    :param dsn: connection link
+    :param use_pool: borrow connections from pool if True, connect per call otherwise
+    :param calls: number of save_batch calls
+    :param batch_size: rows per call
+    :param logger: logger instance
+    :return: list of call durations in milliseconds
+    """
+    db = DB(connection_link=dsn, logger=logger, use_pool=use_pool, pool_min_size=1, pool_max_size=2)
+    on_conflict_stmt = db.prepare_statement(update_keys=['payload'], conflict_key='id')
+
+    durations = []
+    for call in range(calls):
+        rows = [{'id': call * batch_size + i, 'payload': f'row {i}'} for i in range(batch_size)]
+        started_at = perf_counter()
+        if db.save_batch(rows, table_name=BENCH_TABLE, on_conflict_stmt=on_conflict_stmt) is not True:
+            exit('benchmark save failed')
+        durations.append((perf_counter() - started_at) * 1000)
+
+    db.close()
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pooled vs unpooled DB.save_batch per-call overhead')
+    parser.add_argument('--dsn', default=None, help='connection link (settings/db.json by default)')
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=1)
+    args = parser.parse_args()
+
+    dsn = args.dsn or get_default_dsn()
+
+    logger = logging.getLogger('db_pool_benchmark')
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.WARNING)
+
+    setup = DB(connection_link=dsn, logger=logger, use_pool=False)
+    conn = setup.get_connection()
+    if not conn:
+        exit('cannot connect to database')
+
+    with conn.cursor() as cur:
+        cur.execute(f'CREATE TABLE IF NOT EXISTS {BENCH_TABLE} (id BIGINT PRIMARY KEY, payload TEXT)')
+    conn.commit()
+
+    try:
+        for name, use_pool in (('unpooled', False), ('pooled', True)):
+            durations = run_mode(dsn, use_pool, args.calls, args.batch_size, logger)
+            durations.sort()
+            print(
+                f'{name:<9} calls:: {len(durations)} / '
+                f'mean:: {statistics.mean(durations):.3f} ms / '
+                f'p50:: {durations[len(durations) // 2]:.3f} ms / '
+                f'p95:: {durations[int(len(durations) * 0.95)]:.3f} ms'
+            )
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP TABLE IF EXISTS {BENCH_TABLE}')
+        conn.commit()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
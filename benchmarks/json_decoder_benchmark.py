@@ -0,0 +1,199 @@
+import sys
+import json
+import random
+import argparse
+import tracemalloc
+from glob import glob
+from pathlib import Path
+from time import perf_counter
+
+# set up path for project root directory
+sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    from core.network.json_decoder import JsonDecoder
+except ImportError as ie:
+    exit(f'failed to import JsonDecoder:: {ie}')
+
+try:
+    from services.listing_schema import ListingDecoder, msgspec
+except ImportError as ie:
+    exit(f'failed to import ListingDecoder:: {ie}')
+
+
+def get_listing_product(product_id):
+    """
+    Product of listing-svc response with the fields the scraper reads
+    and the usual unused subtrees (variants, combos, ratings, badges).
+    :param product_id: product id
+    :return: product dictionary
+    """
+
+    mrp = random.randint(1000, 90000)
+    return {
+        'id': str(product_id),
+        'desc': f'Product name {product_id} {random.choice(["Pouch", "Bottle", "Pack", "Box"])}',
+        'pack_desc': '',
+        'brand': {'name': f'Brand {product_id % 400}', 'slug': f'brand-{product_id % 400}', 'url': f'/pb/brand-{product_id % 400}/'},
+        'absolute_url': f'/pd/{product_id}/product-name-{product_id}/',
+        'unit': random.choice(['1 kg', '500 g', '1 L', '1 pc']),
+        'magnitude': random.choice(['1 kg', '500 g', '1 L', '1 pc']),
+        'w': '1 kg',
+        'images': [
+            {
+                's': f'https://www.bbassets.com/media/uploads/p/s/{product_id}_{i}.jpg',
+                'm': f'https://www.bbassets.com/media/uploads/p/m/{product_id}_{i}.jpg',
+                'l': f'https://www.bbassets.com/media/uploads/p/l/{product_id}_{i}.jpg',
+                'xl': f'https://www.bbassets.com/media/uploads/p/xl/{product_id}_{i}.jpg',
+                'xxl': f'https://www.bbassets.com/media/uploads/p/xxl/{product_id}_{i}.jpg',
+            }
+            for i in range(random.randint(1, 5))
+        ],
+        'pricing': {
+            'discount': {
+                'mrp': str(mrp),
+                'd_text': '10% OFF',
+                'd_avail': 'true',
+                'prim_price': {'sp': str(mrp * 9 // 10), 'base_unit': '1 kg', 'base_price': str(mrp)},
+                'sec_price': None,
+                'offer_available': 'false',
+                'offer_entry_text': '',
+            },
+            'promo': {'type': None, 'label': None, 'name': None, 'desc': None, 'saving': None},
+        },
+        'availability': {'avail_status': '001', 'display_mrp': True, 'display_sp': True, 'not_for_sale': False, 'button': 'Add', 'show_express': True},
+        'is_best_value': random.random() < 0.1,
+        'sku_max_quantity': random.randint(1, 50),
+        'category': {
+            'tlc_name': 'Foodgrains, Oil & Masala', 'tlc_slug': 'foodgrains-oil-masala',
+            'mlc_name': 'Atta, Flours & Sooji', 'mlc_slug': 'atta-flours-sooji',
+            'llc_name': 'Atta Whole Wheat', 'llc_slug': 'atta-whole-wheat', 'llc_id': 1234,
+        },
+        'parent_info': {'created_on': '2021-06-10 08:11:20', 'updated_on': '2024-05-01 12:00:03', 'parent_id': None},
+        'variable_weight': None,
+        'additional_attr': {'info': [{'type': 'veg', 'label': 'Veg', 'image': 'https://www.bbassets.com/static/veg.png'}]},
+        'rating_info': {'avg_rating': round(random.uniform(3, 5), 1), 'rating_count': random.randint(0, 5000), 'review_count': random.randint(0, 500)},
+        'combo_info': {'destination': None, 'total_saving_msg': '', 'items': [], 'annotation_msg': ''},
+        'tags': [{'header': 'Bestseller', 'values': [{'display_name': 'Bestseller', 'dest_type': 'slug', 'dest_slug': 'bestseller'}]}],
+        'children': [],
+        'sku_ranking': {'rank': random.randint(1, 1000), 'score': random.random()},
+        'visibility': 'both',
+    }
+
+
+def get_listing_payload(start, size=48):
+    """
+    Encoded listing-svc page like response
+    :param start: first product id
+    :param size: products per page
+    :return: bytes
+    """
+
+    data = {
+        'tabs': [{
+            'tab_type': 'all',
+            'product_info': {
+                'number_of_pages': 20,
+                'products': [get_listing_product(product_id) for product_id in range(start, start + size)],
+                'facets': [{'name': 'Brand', 'values': [{'name': f'Brand {i}', 'count': i} for i in range(50)]}],
+            },
+        }],
+        'seo_info': {'title': 'Atta Whole Wheat', 'description': '', 'keywords': ''},
+    }
+    return json.dumps(data).encode()
+
+
+def load_payloads(pattern, pages):
+    """
+    Recorded listing responses (raw bodies saved as files) OR generated pages
+    :param pattern: glob pattern of recorded payload files
+    :param pages: number of generated pages if no pattern is given
+    :return: list of bytes
+    """
+
+    if pattern:
+        return [Path(path).read_bytes() for path in sorted(glob(pattern))]
+
+    random.seed(0)
+    return [get_listing_payload(page * 48 + 1) for page in range(pages)]
+
+
+def run_backend(decoder, payloads, repeat):
+    """
+    :param decoder: JsonDecoder instance
+    :param payloads: list of raw response bodies
+    :param repeat: number of passes over payloads
+    :return: seconds per pass
+    """
+
+    started_at = perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            decoder.decode(payload)
+    return (perf_counter() - started_at) / repeat
+
+
+def get_peak_memory(decoder, payloads):
+    """
+    :param decoder: JsonDecoder or ListingDecoder instance
+    :param payloads: list of raw response bodies
+    :return: average peak of memory allocated while decoding a page, in bytes
+    """
+
+    peaks = 0
+    tracemalloc.start()
+    for payload in payloads:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        data = decoder.decode(payload)
+        peaks += tracemalloc.get_traced_memory()[1] - baseline
+        del data
+    tracemalloc.stop()
+
+    return peaks / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Decode listing payloads with every installed JSON backend and the listing schema')
+    parser.add_argument('--payloads', help='glob of recorded listing-svc response bodies, e.g. "recorded/*.json"')
+    parser.add_argument('--pages', type=int, default=200, help='number of generated pages if no payloads are given')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.payloads, args.pages)
+    if not payloads:
+        exit(f'no payloads found:: {args.payloads}')
+
+    size = sum(len(payload) for payload in payloads)
+    print(f'payloads:: {len(payloads)} / {size / 2 ** 20:.1f} MB')
+
+    reference = JsonDecoder('json')
+
+    decoders = {}
+    for backend in JsonDecoder.backends:
+        if not JsonDecoder.is_available(backend):
+            print(f'{backend:<8} not installed')
+            continue
+
+        decoders[backend] = JsonDecoder(backend)
+        if not all(decoders[backend].decode(payload) == reference.decode(payload) for payload in payloads):
+            print(f'{backend:<8} result differs from stdlib json')
+
+    # typed listing schema: only fields used by the scraper are decoded
+    if msgspec is not None:
+        decoders['schema'] = ListingDecoder(reference)
+
+    results = {name: run_backend(decoder, payloads, args.repeat) for name, decoder in decoders.items()}
+
+    for name, elapsed in results.items():
+        print(
+            f'{name:<8} pages per s:: {len(payloads) / elapsed:,.0f} / '
+            f'MB per s:: {size / 2 ** 20 / elapsed:,.1f} / '
+            f'ms per page:: {elapsed / len(payloads) * 1000:.3f} / '
+            f'speedup:: {results["json"] / elapsed:.2f}x / '
+            f'peak memory per page:: {get_peak_memory(decoders[name], payloads) / 1024:,.0f} KB'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import sys
+import json
+import random
+import logging
+import argparse
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+# set up path for project root directory
+sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    from core.db.db import DB
+except ImportError as ie:
+    exit(f'failed to import DB module:: {ie}')
+
+try:
+    from services.product_record import ProductRecord
+except ImportError as ie:
+    exit(f'failed to import ProductRecord:: {ie}')
+
+BRANDS = [f'Brand {i}' for i in range(500)]
+CATEGORIES = [(f'Main {i % 10}', f'Mid {i % 60}', f'Leaf {i}') for i in range(400)]
+UNITS = ['1 kg', '500 g', '1 L', '250 ml', '1 pc', '6 pcs']
+
+
+def get_payload_chunk(start, size):
+    """
+    Listing API like products, decoded from JSON so every string is a separate object
+    :param start: first product id
+    :param size: number of products
+    :return: list of product dictionaries
+    """
+    products = []
+    for product_id in range(start, start + size):
+        main, mid, leaf = random.choice(CATEGORIES)
+        products.append({
+            'id': product_id,
+            'desc': f'Product name {product_id}',
+            'brand': {'name': random.choice(BRANDS)},
+            'absolute_url': f'/pd/{product_id}/product-name-{product_id}/',
+            'unit': random.choice(UNITS),
+            'magnitude': random.choice(UNITS),
+            'images': [{'l': f'https://www.bbassets.com/media/uploads/p/l/{product_id}_{i}.jpg'} for i in range(2)],
+            'mrp': random.randint(1000, 50000) / 100,
+            'sp': random.randint(1000, 50000) / 100,
+            'avail_status': '001',
+            'category': {'tlc_name': main, 'mlc_name': mid, 'llc_name': leaf},
+            'created_on': '2024-01-01 10:00:00',
+            'updated_on': '2024-06-01 10:00:00',
+        })
+    return json.loads(json.dumps(products))
+
+
+def get_fields(product):
+    """
+    Fields extracted by ProductsScraper.parse_product_data
+    :param product: product dictionary of listing API
+    :return: dictionary of fields
+    """
+    category = product['category']
+    return dict(
+        product_id=product['id'],
+        name=product['desc'],
+        brand=product['brand']['name'],
+        product_url=product['absolute_url'],
+        images=[image['l'] for image in product['images']],
+        unit=product['unit'],
+        quantity_label=product['magnitude'],
+        price_mrp=product['mrp'],
+        price_sp=product['sp'],
+        discount_percent=round((product['mrp'] - product['sp']) / product['mrp'] * 100, 2),
+        is_best_value=False,
+        available_quantity=5,
+        availability_code=product['avail_status'],
+        category_main=category['tlc_name'],
+        category_mid=category['mlc_name'],
+        category_leaf=category['llc_name'],
+        created_at_on_web_site=product['created_on'],
+        updated_at_on_web_site=product['updated_on'],
+        category_id=1,
+        row_hash='0' * 32,
+    )
+
+
+def run_mode(name, build, count, chunk_size, db):
+    """
+    Build `count` products and encode them for COPY
+    :param name: mode name
+    :param build: callable building product object from fields
+    :param count: number of products
+    :param chunk_size: number of products decoded at once
+    :param db: DB instance (used for COPY encoding only)
+    :return:
+    """
+    random.seed(0)
+    tracemalloc.start()
+
+    items = []
+    build_time = 0
+    for start in range(0, count, chunk_size):
+        chunk = get_payload_chunk(start + 1, min(chunk_size, count - start))
+        started_at = perf_counter()
+        items.extend(build(**get_fields(product)) for product in chunk)
+        build_time += perf_counter() - started_at
+        del chunk
+
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    columns = list(items[0].keys())
+    started_at = perf_counter()
+    encoded = sum(len(line) for line in db.iter_copy_rows(items, columns))
+    encode_time = perf_counter() - started_at
+
+    print(
+        f'{name:<14} products:: {len(items)} / '
+        f'memory:: {memory / 2 ** 20:.1f} MB ({memory / len(items):.0f} B per product) / '
+        f'build:: {len(items) / build_time:,.0f} per s / '
+        f'COPY encode:: {len(items) / encode_time:,.0f} per s ({encoded / 2 ** 20:.0f} MB)'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-product dict vs ProductRecord memory and throughput')
+    parser.add_argument('--count', type=int, default=1000000)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    logger = logging.getLogger('product_record_benchmark')
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.WARNING)
+
+    # connection is never opened, DB is used for COPY encoding only
+    db = DB(connection_link='postgresql://localhost/benchmark', logger=logger, use_pool=False)
+
+    run_mode('dict', dict, args.count, args.chunk_size, db)
+    run_mode('ProductRecord', ProductRecord, args.count, args.chunk_size, db)
+
+
+if __name__ == '__main__':
+    main()
@@ -71,7 +71,11 @@ class BaseMain:
         self.db_config = self.db_full_config.get(self.service_name, self.db_full_config)
 
         # aiopg init section start
-        self.db = AsyncDB(connection_link='postgresql://{user}:{pwd}@{host}:{port}/{db}'.format(**self.db_config), logger=self.logger)
+        self.db = AsyncDB(
+            connection_link='postgresql://{user}:{pwd}@{host}:{port}/{db}'.format(**self.db_config),
+            logger=self.logger,
+            **self.db_config.get('pool', {})
+        )
         # aiopg init section end
 
         # proxies init section start
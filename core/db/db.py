@@ -1,18 +1,65 @@
+import json
 import inspect
+from datetime import date, datetime, timedelta
 import psycopg2
 import psycopg2.extras
 import logging
 from time import sleep as wait
 
+try:
+    from core.db.pool import ConnectionPool, PoolTimeout
+except ImportError as ie:
+    exit(f'failed to import connection pool module:: {ie}')
+
+
+class CopyStream:
+    """
+    Read-only file-like object over an iterable of text chunks.
+    Lets COPY ... FROM STDIN consume rows as they are encoded instead of one big buffer.
+    """
+
+    def __init__(self, chunks):
+        """
+        :param chunks: iterable of strings
+        """
+
+        self.chunks = iter(chunks)
+        self.buffer = ''
+
+    def read(self, size=-1):
+        """
+        Read up to `size` characters (everything if size is negative).
+
+        :param size: number of characters
+        :return: string (empty when exhausted)
+        """
+
+        while size < 0 or len(self.buffer) < size:
+            try:
+                self.buffer += next(self.chunks)
+            except StopIteration:
+                break
+
+        if size < 0:
+            data, self.buffer = self.buffer, ''
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
 
 class DB:
-    def __init__(self, connection_link, logger=None, extensions_scheme='extensions'):
+    def __init__(self, connection_link, logger=None, extensions_scheme='extensions', use_pool=True, pool_min_size=1, pool_max_size=10, pool_max_lifetime=3600, pool_health_check_interval=30):
         """
         Initialize the database handler class.
 
         :param connection_link: PostgreSQL connection string
         :param logger: optional logger instance (if not provided, default logger will be created)
         :param extensions_scheme: schema name for extensions (default: 'extensions')
+        :param use_pool: borrow connections from a pool instead of connecting per call (default: True)
+        :param pool_min_size: number of connections kept open by the pool
+        :param pool_max_size: maximum number of open connections
+        :param pool_max_lifetime: seconds after which pooled connection is recycled
+        :param pool_health_check_interval: idle seconds after which pooled connection is checked before reuse
         """
 
         self.conn_link = connection_link
@@ -39,6 +86,61 @@ class DB:
         self.max_connection_retries = 10
         self.connection_retry_timeout = 1
 
+        # partitions already ensured during this run
+        self.known_partitions = set()
+
+        # Connection pool (opened lazily on first borrow)
+        self.pool = ConnectionPool(
+            connect=self.get_connection,
+            min_size=pool_min_size,
+            max_size=pool_max_size,
+            max_lifetime=pool_max_lifetime,
+            health_check_interval=pool_health_check_interval,
+            logger=self.logger
+        ) if use_pool else None
+
+    def borrow_connection(self):
+        """
+        Get a connection from the pool (or open a new one if pooling is disabled).
+
+        :return: psycopg2 connection object OR False on failure
+        """
+
+        if not self.pool:
+            return self.get_connection()
+
+        try:
+            conn = self.pool.getconn()
+        except PoolTimeout as e:
+            self.logger.error(f'connection pool exhausted:: {e}')
+            return False
+
+        # keep min_size connections warm for the next callers
+        self.pool.fill()
+        return conn
+
+    def release_connection(self, conn, discard=False):
+        """
+        Return a connection to the pool (or close it if pooling is disabled).
+
+        :param conn: psycopg2 connection object
+        :param discard: close pooled connection instead of returning it
+        """
+
+        if not self.pool:
+            conn.close()
+            return
+
+        self.pool.putconn(conn, discard=discard)
+
+    def close(self):
+        """
+        Close all pooled connections.
+        """
+
+        if self.pool:
+            self.pool.closeall()
+
     def get_connection(self):
         """
         Attempt to establish a database connection with retry logic.
@@ -80,27 +182,28 @@ class DB:
     def cursor(method):
         """
         Decorator to handle database connection and cursor management.
-        - Opens a connection if needed
+        - Borrows a connection from the pool if needed
         - Provides a cursor (RealDictCursor) to the wrapped function
-        - Closes connection and cursor after use
+        - Closes cursor and returns connection to the pool after use
         """
 
         def wrapper(self, *args, **kwargs):
             conn = None
             cur = None
+            is_failed = False
 
             try:
                 # Check if method expects a cursor argument
                 if self.get_method_args(method, 'cursor'):
-                    conn = self.get_connection()
+                    conn = self.borrow_connection()
                     if not conn:
                         self.logger.error(f'failed to establish database connection')
                         return False
 
                     # Create a RealDictCursor (results returned as dicts instead of tuples)
-                    cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+                    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
-                    kwargs.update({'cursor': cursor})
+                    kwargs.update({'cursor': cur})
 
                     # Pass connection as well if the method requires it
                     if self.get_method_args(method, 'connection'):
@@ -112,19 +215,24 @@ class DB:
                 return method(self, *args, **kwargs)
 
             except Exception as e:
+                is_failed = True
                 self.logger.exception(f'unexpected exception occurred during connection establishing :: {e}')
             finally:
-                # Ensure cleanup
-                conn.close() if conn else None
-                cur.close() if cur else None
+                # Ensure cleanup (uncommitted work is rolled back by the pool)
+                if cur and not cur.closed:
+                    cur.close()
+                if conn:
+                    self.release_connection(conn, discard=is_failed)
         return wrapper
 
-    def prepare_statement(self, update_keys, conflict_key, **optional_parameters):
+    def prepare_statement(self, update_keys, conflict_key, change_key=None, table_name=None, **optional_parameters):
         """
        Build an UPSERT (ON CONFLICT) SQL statement.
 
        :param update_keys: list of column names to update
        :param conflict_key: column(s) used as conflict keys
+       :param change_key: optional content hash column; existing row is updated only when its hash differs
+       :param table_name: target table name, required with change_key
        :param optional_parameters: extra column=value pairs for update
        :return: SQL ON CONFLICT clause as a string OR False on error
        """
@@ -143,13 +251,39 @@ class DB:
 
             # Add optional custom update expressions
             conflict_key = conflict_key if isinstance(conflict_key, str) else ','.join(conflict_key)
-            return f"ON CONFLICT({conflict_key}) DO UPDATE SET {up}"
+            statement = f"ON CONFLICT({conflict_key}) DO UPDATE SET {up}"
+
+            # Skip rewriting rows whose content did not change
+            if change_key:
+                target = table_name.split('.')[-1]
+                statement += f" WHERE {target}.{change_key} IS DISTINCT FROM excluded.{change_key}"
+
+            return statement
         except Exception as e:
             self.logger.exception(f'failed to prepare statement:: {update_keys} :: {e}')
             return False
 
+    def get_upsert_counts(self, rows, total):
+        """
+        Split upsert outcome into inserted, updated and unchanged rows.
+        Rows skipped by ON CONFLICT ... WHERE are not returned, so they are counted as unchanged.
+
+        :param rows: rows returned by upsert with RETURNING (xmax = 0) AS inserted
+        :param total: number of unique rows sent to the database
+        :return: dictionary with counters
+        """
+
+        inserted = sum(1 for row in rows if row['inserted'])
+        updated = len(rows) - inserted
+
+        return {
+            'inserted': inserted,
+            'updated': updated,
+            'unchanged': max(total - inserted - updated, 0),
+        }
+
     @cursor
-    def save_batch(self, result, table_name=None, cursor=None, connection=None, on_conflict_stmt=None):
+    def save_batch(self, result, table_name=None, cursor=None, connection=None, on_conflict_stmt=None, returning=None):
         """
         Insert a batch of rows (list of dicts) into a table.
 
@@ -158,7 +292,8 @@ class DB:
         :param cursor: provided by @cursor decorator
         :param connection: provided by @cursor decorator
         :param on_conflict_stmt: optional ON CONFLICT statement
-        :return: True if insert succeeded, False otherwise
+        :param returning: optional RETURNING expressions, returned rows are the result instead of True
+        :return: True (or list of returned rows) if insert succeeded, False otherwise
         """
 
         if not table_name:
@@ -177,18 +312,17 @@ class DB:
         if isinstance(result, dict):
             longest_column_keys = list(result.keys())
             result = [result]
-        # extract keys from the longest dict item to determine columns structure
         else:
-            longest_column_keys = list(max(result, key=len))
+            longest_column_keys = self.get_columns(result)
 
         signs, mog, args_str, insert_statement, columns = [None] * 5
 
         try:
             signs = '(' + ('%s,' * len(longest_column_keys))[:-1] + ')'
             mog = list()
-            for x in result:
-                # fill NULL's for non existed columns during multiple dictionary items saving
-                values = [x.get(key, None) for key in longest_column_keys]
+            # fill NULL's for non existed columns during multiple dictionary items saving
+            rows = result.iter_rows(longest_column_keys) if hasattr(result, 'iter_rows') else ([x.get(key, None) for key in longest_column_keys] for x in result)
+            for values in rows:
                 r = cursor.mogrify(signs, tuple(values))
                 mog.append(r)
                 del values, r
@@ -200,16 +334,19 @@ class DB:
             columns = ', '.join(longest_column_keys)
 
             insert_statement = f"""INSERT INTO {table_name}(""" + columns + """) VALUES """
+            returning_stmt = f" RETURNING {returning}" if returning else ""
             if on_conflict_stmt:
-                cursor.execute(insert_statement + args_str + " " + on_conflict_stmt.strip())
+                cursor.execute(insert_statement + args_str + " " + on_conflict_stmt.strip() + returning_stmt)
             else:
-                cursor.execute(insert_statement + args_str)
+                cursor.execute(insert_statement + args_str + returning_stmt)
+
+            rows = [dict(row) for row in cursor.fetchall()] if returning else None
 
             connection.commit()
 
             self.logger.info(f'data saved:: {table_name}')
 
-            return True
+            return rows if returning else True
 
         except Exception as e:
             self.logger.exception(f'exception occurred while saving::{e}')
@@ -217,49 +354,472 @@ class DB:
         finally:
             del signs, mog, args_str, insert_statement, columns, longest_column_keys
 
-    def save_products(self, result, on_conflict_stmt=None):
+    def get_columns(self, result):
+        """
+        Columns of a batch: declared by columnar batch, otherwise keys of the longest dict item.
+
+        :param result: list of dictionaries OR columnar batch providing `column_names`
+        :return: list of column names
+        """
+
+        if hasattr(result, 'column_names'):
+            return list(result.column_names)
+
+        return list(max(result, key=len))
+
+    def copy_value(self, value):
+        """
+        Encode a single value for COPY ... WITH (FORMAT csv).
+        NULL is an unquoted empty field, every text value is quoted, lists become array literals.
+
+        :param value: python value
+        :return: CSV field as a string
+        """
+
+        if value is None:
+            return ''
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, (int, float)):
+            return repr(value)
+        if isinstance(value, (list, tuple)):
+            elements = []
+            for element in value:
+                if element is None:
+                    elements.append('NULL')
+                else:
+                    element = str(element).replace('\\', '\\\\').replace('"', '\\"')
+                    elements.append(f'"{element}"')
+            value = '{' + ','.join(elements) + '}'
+        elif isinstance(value, dict):
+            value = json.dumps(value)
+        elif not isinstance(value, str):
+            value = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+        return '"' + value.replace('"', '""') + '"'
+
+    def iter_copy_rows(self, result, columns):
+        """
+        Encode rows as CSV lines for COPY.
+
+        :param result: list of dictionaries OR columnar batch providing `get_column(name)`
+        :param columns: column names in COPY order
+        :return: generator of CSV lines
+        """
+
+        # columnar batch is encoded column by column, rows only join encoded fields
+        if hasattr(result, 'get_column'):
+            encoded = [list(map(self.copy_value, result.get_column(name))) for name in columns]
+            for fields in zip(*encoded):
+                yield ','.join(fields) + '\n'
+            return
+
+        for x in result:
+            yield ','.join(self.copy_value(x.get(key, None)) for key in columns) + '\n'
+
+    @cursor
+    def copy_batch(self, result, table_name=None, cursor=None, connection=None, on_conflict_stmt=None, distinct_on=None, returning=None):
+        """
+        Bulk upsert a batch of rows through a temporary staging table:
+        rows are streamed with COPY ... FROM STDIN (CSV) and merged into the
+        target table with a single INSERT ... SELECT ... ON CONFLICT.
+
+        :param result: list of dictionaries
+        :param table_name: name of the target table
+        :param cursor: provided by @cursor decorator
+        :param connection: provided by @cursor decorator
+        :param on_conflict_stmt: optional ON CONFLICT statement
+        :param distinct_on: optional conflict column(s); keeps one staging row per key, since ON CONFLICT cannot touch a row twice
+        :param returning: optional RETURNING expressions, returned rows are the result instead of True
+        :return: True (or list of returned rows) if saving succeeded, False otherwise
+        """
+
+        if not table_name:
+            self.logger.error(f'table name is required parameter')
+            return False
+
+        if not hasattr(result, '__iter__'):
+            self.logger.error(f'wrong saving data type:: {type(result)}')
+            return False
+
+        if len(result) == 0:
+            self.logger.warning(f'nothing to save: list is empty')
+            return True
+
+        if isinstance(result, dict):
+            result = [result]
+
+        columns = self.get_columns(result)
+        columns_str = ', '.join(columns)
+
+        try:
+            # append-only batch: nothing to merge, copy straight into the target table
+            if not on_conflict_stmt and not distinct_on and not returning:
+                cursor.copy_expert(
+                    f"COPY {table_name} ({columns_str}) FROM STDIN WITH (FORMAT csv)",
+                    CopyStream(self.iter_copy_rows(result, columns))
+                )
+                connection.commit()
+
+                self.logger.info(f'data copied:: {table_name} :: {len(result)}')
+                return True
+
+            # temporary table lives until commit, constraints except NOT NULL are not copied
+            cursor.execute(f"CREATE TEMP TABLE bulk_staging (LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP")
+
+            cursor.copy_expert(
+                f"COPY bulk_staging ({columns_str}) FROM STDIN WITH (FORMAT csv)",
+                CopyStream(self.iter_copy_rows(result, columns))
+            )
+
+            select_statement = f"SELECT {columns_str} FROM bulk_staging"
+            if distinct_on:
+                distinct_on = distinct_on if isinstance(distinct_on, str) else ','.join(distinct_on)
+                select_statement = f"SELECT DISTINCT ON ({distinct_on}) {columns_str} FROM bulk_staging ORDER BY {distinct_on}"
+
+            insert_statement = f"INSERT INTO {table_name}({columns_str}) {select_statement}"
+            if on_conflict_stmt:
+                insert_statement += " " + on_conflict_stmt.strip()
+            if returning:
+                insert_statement += f" RETURNING {returning}"
+
+            cursor.execute(insert_statement)
+            rows = [dict(row) for row in cursor.fetchall()] if returning else None
+
+            connection.commit()
+
+            self.logger.info(f'data copied:: {table_name} :: {len(result)}')
+
+            return rows if returning else True
+
+        except Exception as e:
+            self.logger.exception(f'exception occurred while copying::{e}')
+            return False
+
+    def save_products(self, result, on_conflict_stmt=None, bulk=False, returning=None):
         """
         Convenience wrapper to save products into bigbasket.products table.
+
+        :param result: list of product dictionaries
+        :param on_conflict_stmt: optional ON CONFLICT statement
+        :param bulk: use COPY based bulk upsert instead of multi-row INSERT
+        :param returning: optional RETURNING expressions, returned rows are the result instead of True
+        """
+
+        if bulk:
+            return self.copy_batch(result, table_name='bigbasket.products', on_conflict_stmt=on_conflict_stmt, distinct_on='product_id', returning=returning)
+
+        return self.save_batch(result, table_name='bigbasket.products', on_conflict_stmt=on_conflict_stmt, returning=returning)
+
+    def get_partition_bounds(self, day, partition='day'):
+        """
+        Range of a daily or monthly partition containing the given day.
+
+        :param day: date or datetime
+        :param partition: partition granularity, 'day' or 'month'
+        :return: tuple (partition suffix, lower bound, upper bound)
+        """
+
+        day = day.date() if isinstance(day, datetime) else day
+
+        if partition == 'month':
+            lower = day.replace(day=1)
+            upper = (lower + timedelta(days=32)).replace(day=1)
+            return lower.strftime('%Y%m'), lower, upper
+
+        return day.strftime('%Y%m%d'), day, day + timedelta(days=1)
+
+    @cursor
+    def ensure_partition(self, table_name, day, partition='day', cursor=None, connection=None):
+        """
+        Create a range partition of table_name covering the given day if it does not exist.
+        Workers creating the same partition are serialized by a transaction-level advisory lock
+        (CREATE TABLE IF NOT EXISTS alone fails in concurrent transactions).
+
+        :param table_name: partitioned (parent) table name
+        :param day: date or datetime the partition has to cover
+        :param partition: partition granularity, 'day' or 'month'
+        :param cursor: provided by @cursor decorator
+        :param connection: provided by @cursor decorator
+        :return: partition name OR False on error
+        """
+
+        suffix, lower, upper = self.get_partition_bounds(day, partition)
+        partition_name = f'{table_name}_{suffix}'
+
+        try:
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (partition_name,))
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {partition_name} PARTITION OF {table_name} FOR VALUES FROM (%s) TO (%s)",
+                (lower, upper)
+            )
+            connection.commit()
+            return partition_name
+        except psycopg2.errors.DuplicateTable:
+            # created concurrently without the lock (e.g. by a migration)
+            connection.rollback()
+            return partition_name
+        except Exception as e:
+            self.logger.exception(f'failed to create partition:: {partition_name} :: {e}')
+            return False
+
+    @cursor
+    def drop_partitions(self, table_name, keep, partition='day', cursor=None, connection=None):
+        """
+        Retention: drop partitions which end before `keep` days/months ago.
+        Only partitions named by ensure_partition are considered.
+
+        :param table_name: partitioned (parent) table name
+        :param keep: number of days (or months) to keep, including current one
+        :param partition: partition granularity, 'day' or 'month'
+        :param cursor: provided by @cursor decorator
+        :param connection: provided by @cursor decorator
+        :return: list of dropped partitions OR False on error
+        """
+
+        schema, _, parent = table_name.rpartition('.')
+        schema = schema or 'public'
+
+        today = date.today()
+        if partition == 'month':
+            month = today.year * 12 + today.month - keep
+            cutoff = date(month // 12, month % 12 + 1, 1)
+        else:
+            cutoff = today - timedelta(days=keep - 1)
+
+        try:
+            cursor.execute(
+                """
+                SELECT child.relname AS name
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+                WHERE ns.nspname = %s AND parent.relname = %s
+                """,
+                (schema, parent)
+            )
+
+            dropped = []
+            for row in cursor.fetchall():
+                suffix = row['name'][len(parent) + 1:]
+                try:
+                    lower = datetime.strptime(suffix, '%Y%m' if partition == 'month' else '%Y%m%d').date()
+                except ValueError:
+                    continue
+
+                _, _, upper = self.get_partition_bounds(lower, partition)
+                if upper <= cutoff:
+                    cursor.execute(f"DROP TABLE IF EXISTS {schema}.{row['name']}")
+                    dropped.append(row['name'])
+
+            connection.commit()
+
+            if dropped:
+                self.logger.info(f'partitions dropped:: {table_name} :: {dropped}')
+            return dropped
+        except Exception as e:
+            self.logger.exception(f'failed to drop partitions:: {table_name} :: {e}')
+            return False
+
+    def save_price_history(self, result, partition='day'):
+        """
+        Append price snapshots into bigbasket.price_history, creating missing partitions first.
+
+        :param result: list of dictionaries with product_id, scraped_at and price columns
+        :param partition: partition granularity, 'day' or 'month'
+        :return: True if saving succeeded, False otherwise
         """
 
-        return self.save_batch(result, table_name='bigbasket.products', on_conflict_stmt=on_conflict_stmt)
+        for row in result:
+            partition_name = 'bigbasket.price_history_' + self.get_partition_bounds(row['scraped_at'], partition)[0]
+            if partition_name in self.known_partitions:
+                continue
+
+            if not self.ensure_partition('bigbasket.price_history', row['scraped_at'], partition):
+                return False
+            self.known_partitions.add(partition_name)
+
+        return self.copy_batch(result, table_name='bigbasket.price_history')
+
+    def save_checkpoints(self, result):
+        """
+        Store completed (category, page) work units of a run.
+
+        :param result: list of dictionaries with run_id, category_id, page, number_of_pages
+        :return: True if saving succeeded, False otherwise
+        """
+
+        return self.save_batch(result, table_name='bigbasket.scrape_checkpoints', on_conflict_stmt='ON CONFLICT (run_id, category_id, page) DO NOTHING')
+
+    @cursor
+    def get_checkpoints(self, run_id, cursor=None):
+        """
+        Fetch completed work units of a run.
+
+        :param run_id: run identifier
+        :param cursor: provided by @cursor decorator
+        :return: list of dictionaries OR False on error
+        """
+
+        try:
+            cursor.execute(
+                "SELECT category_id, page, number_of_pages FROM bigbasket.scrape_checkpoints WHERE run_id = %s",
+                (run_id,)
+            )
+            return [dict(item) for item in cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Unexpected error on getting checkpoints:: {run_id} :: {e}")
+            return False
+
+    def save_category_stats(self, result):
+        """
+        Store per-category statistics of a run.
+
+        :param result: list of dictionaries with category_id, run_id, number_of_pages, products, new_products, changed_products, duplicate_products
+        :return: True if saving succeeded, False otherwise
+        """
+
+        # several workers of a shared run add up their counters
+        return self.save_batch(result, table_name='bigbasket.category_stats', on_conflict_stmt=self.prepare_statement(
+            update_keys=[],
+            conflict_key=['category_id', 'run_id'],
+            number_of_pages='GREATEST(category_stats.number_of_pages, excluded.number_of_pages)',
+            products='category_stats.products + excluded.products',
+            new_products='category_stats.new_products + excluded.new_products',
+            changed_products='category_stats.changed_products + excluded.changed_products',
+            duplicate_products='category_stats.duplicate_products + excluded.duplicate_products',
+            scraped_at='CURRENT_TIMESTAMP'
+        ))
+
+    @cursor
+    def get_category_stats(self, cursor=None):
+        """
+        Aggregate statistics of previous visits per category:
+        latest page and product counts, time of the last visit, and number of
+        price/availability changes observed over product-days between consecutive visits.
+
+        :param cursor: provided by @cursor decorator
+        :return: dictionary category_id -> statistics OR False on error
+        """
+
+        try:
+            cursor.execute("""
+                WITH visits AS (
+                    SELECT category_id,
+                        scraped_at,
+                        number_of_pages,
+                        products,
+                        changed_products,
+                        EXTRACT(EPOCH FROM scraped_at - LAG(scraped_at) OVER (PARTITION BY category_id ORDER BY scraped_at)) / 86400 AS interval_days,
+                        ROW_NUMBER() OVER (PARTITION BY category_id ORDER BY scraped_at DESC) AS visit_number
+                    FROM bigbasket.category_stats
+                )
+                SELECT category_id,
+                    max(scraped_at) AS last_scraped_at,
+                    max(number_of_pages) FILTER (WHERE visit_number = 1) AS number_of_pages,
+                    max(products) FILTER (WHERE visit_number = 1) AS products,
+                    coalesce(sum(changed_products) FILTER (WHERE interval_days > 0), 0)::float AS changed_products,
+                    coalesce(sum(products * interval_days) FILTER (WHERE interval_days > 0), 0)::float AS product_days
+                FROM visits
+                GROUP BY category_id
+            """)
+            return {item['category_id']: dict(item) for item in cursor.fetchall()}
+        except Exception as e:
+            self.logger.error(f"Unexpected error on getting category statistics:: {e}")
+            return False
+
+    # columns exported from bigbasket.products
+    results_query = """
+        SELECT product_id,
+            name,
+            brand,
+            product_url,
+            images,
+            unit,
+            quantity_label,
+            price_mrp,
+            price_sp,
+            discount_percent,
+            is_best_value,
+            available_quantity,
+            availability_code,
+            category_main,
+            category_mid,
+            category_leaf,
+            created_at_on_web_site::text,
+            updated_at_on_web_site::text
+        FROM bigbasket.products
+    """
+
+    # same columns with timestamps as datetime objects, for typed exports (Parquet)
+    typed_results_query = results_query.replace('::text', '')
 
     @cursor
     def get_results(self, cursor=None):
         """
         Fetch all products from bigbasket.products table.
+        Loads the whole table into memory, prefer iter_results for exports.
 
         :param cursor: provided by @cursor decorator
         :return: list of dictionaries OR False on error
         """
 
         try:
-            query = f"""
-                SELECT product_id,
-                name,
-                brand,
-                product_url,
-                images,
-                unit,
-                quantity_label,
-                price_mrp,
-                price_sp,
-                discount_percent,
-                is_best_value,
-                available_quantity,
-                availability_code,
-                category_main,
-                category_mid,
-                category_leaf,
-                created_at_on_web_site::text,
-                updated_at_on_web_site::text
-            FROM bigbasket.products;
-            """
-
-            cursor.execute(query)
+            cursor.execute(self.results_query)
             results = cursor.fetchall()
 
             return [dict(item) for item in results]
         except Exception as e:
             self.logger.error("Unexpected error on getting result data")
-            return False
\ No newline at end of file
+            return False
+
+    def iter_results(self, batch_size=5000, query=None):
+        """
+        Stream products from bigbasket.products with a named (server-side) cursor.
+        Only `batch_size` rows are held in memory at once; connection is borrowed
+        for the lifetime of the generator and returned when it is exhausted or closed.
+        Errors are logged and re-raised to the consumer.
+
+        :param batch_size: number of rows fetched per round trip
+        :param query: optional query replacing the default products query
+        :return: generator of dictionaries
+        """
+
+        conn = self.borrow_connection()
+        if not conn:
+            self.logger.error(f'failed to establish database connection')
+            # empty stream would replace the previous export with an empty one
+            raise ConnectionError('failed to establish database connection')
+
+        cur = None
+        is_failed = False
+
+        try:
+            # named cursor keeps the result set on the server, rows are fetched in batches
+            cur = conn.cursor(name='iter_results', cursor_factory=psycopg2.extras.RealDictCursor)
+            cur.itersize = batch_size
+            cur.execute(query or self.results_query)
+
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+
+                for row in rows:
+                    yield dict(row)
+
+                del rows
+
+        except Exception as e:
+            is_failed = True
+            self.logger.exception(f'unexpected error on streaming result data:: {e}')
+            # consumer must not take a truncated stream for a complete one
+            raise
+        finally:
+            try:
+                if cur and not cur.closed:
+                    cur.close()
+            except Exception:
+                is_failed = True
+            self.release_connection(conn, discard=is_failed)
@@ -0,0 +1,204 @@
+import threading
+from collections import deque
+from time import monotonic
+
+import psycopg2
+import psycopg2.extensions
+
+
+class PoolTimeout(Exception):
+    """
+    Raised when no connection becomes free within pool timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+    - keeps at least `min_size` and at most `max_size` connections
+    - connections idle longer than `health_check_interval` are checked with `SELECT 1` before reuse
+    - connections older than `max_lifetime` are closed and replaced
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, max_lifetime=3600, health_check_interval=30, timeout=30, logger=None):
+        """
+        :param connect: callable returning a new psycopg2 connection (or False on failure)
+        :param min_size: number of connections kept open
+        :param max_size: maximum number of open connections
+        :param max_lifetime: seconds after which connection is recycled
+        :param health_check_interval: idle seconds after which connection is checked before reuse
+        :param timeout: seconds to wait for a free connection
+        :param logger: logging.Logger instance
+        """
+
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.logger = logger
+
+        self.condition = threading.Condition()
+
+        # idle connections: (connection, returned at)
+        self.idle = deque()
+        # connection -> created at
+        self.created_at = {}
+        # number of opened connections (idle + borrowed + being opened)
+        self.size = 0
+
+    def open_connection(self):
+        """
+        Open a new connection, reserving a slot in the pool beforehand.
+
+        :return: connection OR False on failure
+        """
+
+        conn = False
+        try:
+            conn = self.connect()
+        finally:
+            with self.condition:
+                if conn:
+                    self.created_at[conn] = monotonic()
+                else:
+                    self.size -= 1
+                    self.condition.notify()
+
+        return conn
+
+    def fill(self):
+        """
+        Open connections up to `min_size`.
+        """
+
+        while True:
+            with self.condition:
+                if self.size >= self.min_size:
+                    return
+                self.size += 1
+
+            conn = self.open_connection()
+            if not conn:
+                return
+
+            self.putconn(conn)
+
+    def is_healthy(self, conn) -> bool:
+        """
+        Check connection with a lightweight query.
+
+        :param conn: psycopg2 connection
+        :return: True if connection is usable
+        """
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute('SELECT 1')
+            conn.rollback()
+            return True
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f'pooled connection health check failed:: {e}')
+            return False
+
+    def is_expired(self, conn) -> bool:
+        """
+        Check whether connection exceeded its maximum lifetime.
+
+        :param conn: psycopg2 connection
+        :return: True if connection has to be recycled
+        """
+
+        return monotonic() - self.created_at.get(conn, 0) > self.max_lifetime
+
+    def discard(self, conn):
+        """
+        Close a connection and free its pool slot.
+
+        :param conn: psycopg2 connection
+        """
+
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+        with self.condition:
+            self.created_at.pop(conn, None)
+            self.size -= 1
+            self.condition.notify()
+
+    def getconn(self):
+        """
+        Borrow a connection, waiting up to `timeout` seconds if pool is exhausted.
+
+        :return: psycopg2 connection OR False if connection cannot be opened
+        """
+
+        deadline = monotonic() + self.timeout
+
+        while True:
+            conn, returned_at = None, None
+
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f'no free connection in {self.timeout}s (max size {self.max_size})')
+                    self.condition.wait(remaining)
+
+                if self.idle:
+                    conn, returned_at = self.idle.pop()
+                else:
+                    self.size += 1
+
+            if conn is None:
+                return self.open_connection()
+
+            if conn.closed or self.is_expired(conn):
+                self.discard(conn)
+                continue
+
+            if monotonic() - returned_at > self.health_check_interval and not self.is_healthy(conn):
+                self.discard(conn)
+                continue
+
+            return conn
+
+    def putconn(self, conn, discard=False):
+        """
+        Return a borrowed connection to the pool.
+        Open transaction is rolled back, broken or expired connections are closed.
+
+        :param conn: psycopg2 connection
+        :param discard: close connection instead of returning it
+        """
+
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard or conn.closed or self.is_expired(conn):
+            self.discard(conn)
+            return
+
+        with self.condition:
+            self.idle.append((conn, monotonic()))
+            self.condition.notify()
+
+    def closeall(self):
+        """
+        Close all idle connections.
+        """
+
+        with self.condition:
+            idle = list(self.idle)
+            self.idle.clear()
+
+        for conn, _ in idle:
+            self.discard(conn)
@@ -0,0 +1,157 @@
+import os
+import io
+import gzip
+import json
+import tempfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class JsonlWriter:
+    """
+    Streaming JSON Lines writer.
+    Records are written one per line into a temporary file next to the target
+    and the file is atomically renamed into place on successful close,
+    so readers never see a truncated export under the final name.
+    Output can be compressed with gzip or zstd (requires `zstandard` package).
+    """
+
+    extensions = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+    def __init__(self, path: str, compression: str = None, compression_level: int = None, flush_every: int = 10000, logger=None):
+        """
+        :param path: target file path (compression extension is appended if missing)
+        :param compression: None, 'gzip' or 'zstd'
+        :param compression_level: optional compression level
+        :param flush_every: flush buffered data every N records, so the temp file can be tailed
+        :param logger: logging.Logger instance
+        """
+
+        if compression not in self.extensions:
+            raise ValueError(f'unsupported compression:: {compression}')
+
+        if compression == 'zstd' and zstandard is None:
+            raise ImportError('zstd compression requires zstandard package')
+
+        extension = self.extensions[compression]
+        self.path = path if path.endswith(extension) else path + extension
+        self.compression = compression
+        self.compression_level = compression_level
+        self.flush_every = flush_every
+        self.logger = logger
+
+        self.count = 0
+        self.tmp_path = None
+        self.raw = None
+        self.stream = None
+
+    def open(self):
+        """
+        Create temporary file in target directory and open (compressed) text stream.
+        """
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, self.tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(self.path) + '.', suffix='.tmp', dir=directory)
+        # mkstemp creates owner-only file, exported file should be readable like a regular one
+        os.chmod(self.tmp_path, 0o644)
+        self.raw = os.fdopen(fd, 'wb')
+
+        if self.compression == 'gzip':
+            binary = gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=self.compression_level or 6)
+        elif self.compression == 'zstd':
+            binary = zstandard.ZstdCompressor(level=self.compression_level or 3).stream_writer(self.raw, closefd=False)
+        else:
+            binary = self.raw
+
+        self.stream = io.TextIOWrapper(binary, encoding='utf-8', newline='\n', write_through=False)
+        return self
+
+    def write(self, record):
+        """
+        Write a single record as one JSON line.
+
+        :param record: json serializable object
+        """
+
+        self.stream.write(json.dumps(record, ensure_ascii=False, default=str))
+        self.stream.write('\n')
+
+        self.count += 1
+        if self.flush_every and self.count % self.flush_every == 0:
+            self.stream.flush()
+
+    def write_many(self, records) -> int:
+        """
+        Write records from any iterable (e.g. generator).
+
+        :param records: iterable of json serializable objects
+        :return: number of records written so far
+        """
+
+        for record in records:
+            self.write(record)
+
+        return self.count
+
+    def close(self, commit: bool = True):
+        """
+        Close stream and move temporary file to target path (or remove it).
+
+        :param commit: rename into place if True, discard otherwise
+        """
+
+        if self.stream is None:
+            return
+
+        try:
+            self.stream.flush()
+            # closing compressor writes its trailer, underlying file stays open
+            if self.compression:
+                self.stream.close()
+            self.raw.flush()
+            os.fsync(self.raw.fileno())
+            self.stream.close()
+            self.raw.close()
+        except Exception:
+            commit = False
+            raise
+        finally:
+            self.stream = None
+
+            if commit:
+                os.replace(self.tmp_path, self.path)
+                if self.logger:
+                    self.logger.info(f'export written:: {self.path} :: {self.count} records')
+            else:
+                if os.path.exists(self.tmp_path):
+                    os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(commit=exc_type is None)
+        return False
+
+
+def export_jsonl(records, path: str, compression: str = None, logger=None):
+    """
+    Stream records into a JSON Lines file with atomic rename.
+
+    :param records: iterable of json serializable objects
+    :param path: target file path
+    :param compression: None, 'gzip' or 'zstd'
+    :param logger: logging.Logger instance
+    :return: number of written records OR exception
+    """
+
+    try:
+        with JsonlWriter(path, compression=compression, logger=logger) as writer:
+            return writer.write_many(records)
+    except Exception as e:
+        return e
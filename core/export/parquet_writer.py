@@ -0,0 +1,199 @@
+import os
+import tempfile
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+def get_products_schema():
+    """
+    Arrow schema of product records built in ProductsScraper.parse_product_data.
+
+    :return: pyarrow.Schema
+    """
+
+    return pa.schema([
+        pa.field('product_id', pa.int64(), nullable=False),
+        pa.field('name', pa.string()),
+        pa.field('brand', pa.string()),
+        pa.field('product_url', pa.string()),
+        pa.field('images', pa.list_(pa.string())),
+        pa.field('unit', pa.string()),
+        pa.field('quantity_label', pa.string()),
+        pa.field('price_mrp', pa.float64()),
+        pa.field('price_sp', pa.float64()),
+        pa.field('discount_percent', pa.float64()),
+        pa.field('is_best_value', pa.bool_()),
+        pa.field('available_quantity', pa.int32()),
+        pa.field('availability_code', pa.string()),
+        pa.field('category_main', pa.string()),
+        pa.field('category_mid', pa.string()),
+        pa.field('category_leaf', pa.string()),
+        pa.field('created_at_on_web_site', pa.timestamp('us')),
+        pa.field('updated_at_on_web_site', pa.timestamp('us')),
+    ])
+
+
+class ParquetExporter:
+    """
+    Streaming Parquet writer.
+    Records are buffered column-wise and flushed as one row group every
+    `row_group_size` records, so memory is bounded by a single row group.
+    The file is written next to the target and atomically renamed on success.
+    Requires `pyarrow` package.
+    """
+
+    def __init__(self, path: str, schema=None, row_group_size: int = 50000, compression: str = 'zstd', logger=None):
+        """
+        :param path: target file path
+        :param schema: pyarrow.Schema (products schema by default)
+        :param row_group_size: number of records per row group
+        :param compression: parquet codec ('zstd', 'snappy', 'gzip', None)
+        :param logger: logging.Logger instance
+        """
+
+        if pa is None:
+            raise ImportError('parquet export requires pyarrow package')
+
+        self.path = path
+        self.schema = schema or get_products_schema()
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.logger = logger
+
+        self.timestamp_columns = {field.name for field in self.schema if pa.types.is_timestamp(field.type)}
+        self.columns = {name: [] for name in self.schema.names}
+
+        self.count = 0
+        self.tmp_path = None
+        self.writer = None
+
+    def open(self):
+        """
+        Create temporary file in target directory and open parquet writer.
+        """
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, self.tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(self.path) + '.', suffix='.tmp', dir=directory)
+        os.close(fd)
+        os.chmod(self.tmp_path, 0o644)
+
+        self.writer = pq.ParquetWriter(self.tmp_path, self.schema, compression=self.compression)
+        return self
+
+    def get_array(self, field):
+        """
+        Buffered values of a column as an arrow array.
+        Timestamps given as text (e.g. Postgres `::text`, any number of fractional digits) are cast by arrow.
+
+        :param field: schema field
+        :return: pyarrow.Array
+        """
+
+        values = self.columns[field.name]
+
+        if field.name in self.timestamp_columns and any(isinstance(value, str) for value in values):
+            return pa.array([str(value) if value else None for value in values], type=pa.string()).cast(field.type)
+
+        return pa.array(values, type=field.type)
+
+    def write(self, record: dict):
+        """
+        Buffer a single record, flushing a row group when it is full.
+
+        :param record: product dictionary
+        """
+
+        for name, values in self.columns.items():
+            values.append(record.get(name))
+
+        self.count += 1
+        if len(self.columns['product_id']) >= self.row_group_size:
+            self.flush()
+
+    def write_many(self, records) -> int:
+        """
+        Write records from any iterable (e.g. generator).
+
+        :param records: iterable of product dictionaries
+        :return: number of records written so far
+        """
+
+        for record in records:
+            self.write(record)
+
+        return self.count
+
+    def flush(self):
+        """
+        Write buffered records as one row group.
+        """
+
+        if not self.columns['product_id']:
+            return
+
+        arrays = [self.get_array(field) for field in self.schema]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema), row_group_size=self.row_group_size)
+
+        for values in self.columns.values():
+            values.clear()
+
+    def close(self, commit: bool = True):
+        """
+        Flush remaining records, close writer and move file to target path (or remove it).
+
+        :param commit: rename into place if True, discard otherwise
+        """
+
+        if self.writer is None:
+            return
+
+        try:
+            if commit:
+                self.flush()
+            self.writer.close()
+        except Exception:
+            commit = False
+            raise
+        finally:
+            self.writer = None
+
+            if commit:
+                os.replace(self.tmp_path, self.path)
+                if self.logger:
+                    self.logger.info(f'export written:: {self.path} :: {self.count} records')
+            else:
+                if os.path.exists(self.tmp_path):
+                    os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(commit=exc_type is None)
+        return False
+
+
+def export_parquet(records, path: str, row_group_size: int = 50000, compression: str = 'zstd', logger=None):
+    """
+    Stream product records into a Parquet file with atomic rename.
+
+    :param records: iterable of product dictionaries
+    :param path: target file path
+    :param row_group_size: number of records per row group
+    :param compression: parquet codec
+    :param logger: logging.Logger instance
+    :return: number of written records OR exception
+    """
+
+    try:
+        with ParquetExporter(path, row_group_size=row_group_size, compression=compression, logger=logger) as exporter:
+            return exporter.write_many(records)
+    except Exception as e:
+        return e
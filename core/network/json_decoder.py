@@ -0,0 +1,95 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JsonDecoder:
+    """
+    JSON decoder of raw response bodies with pluggable backends.
+    `orjson` and `msgspec` decode bytes directly and are several times faster
+    than the standard library; `auto` picks the first installed one
+    and falls back to stdlib `json`.
+    """
+
+    # preference order of `auto`
+    backends = ('orjson', 'msgspec', 'json')
+
+    def __init__(self, backend: str = 'auto'):
+        """
+        :param backend: 'auto', 'orjson', 'msgspec' or 'json'
+        """
+
+        if backend == 'auto':
+            backend = next(name for name in self.backends if self.is_available(name))
+
+        if backend not in self.backends:
+            raise ValueError(f'unsupported json backend:: {backend}')
+
+        if not self.is_available(backend):
+            raise ImportError(f'json backend {backend} requires {backend} package')
+
+        self.backend = backend
+
+        if backend == 'orjson':
+            self.loads = orjson.loads
+        elif backend == 'msgspec':
+            # decoder instance is reusable and thread safe
+            self.loads = msgspec.json.Decoder().decode
+        else:
+            self.loads = json.loads
+
+    @staticmethod
+    def is_available(backend: str) -> bool:
+        """
+        :param backend: backend name
+        :return: True if the backend package is installed
+        """
+
+        if backend == 'orjson':
+            return orjson is not None
+        if backend == 'msgspec':
+            return msgspec is not None
+        return backend == 'json'
+
+    def decode(self, content):
+        """
+        Decode JSON document.
+
+        :param content: raw response body (bytes) or text
+        :return: decoded python object
+        """
+
+        return self.loads(content)
+
+    def __repr__(self):
+        return f'JsonDecoder({self.backend})'
+
+
+def create_json_decoder(backend: str = 'auto', logger=None) -> JsonDecoder:
+    """
+    Build a decoder, falling back to stdlib json if the requested backend is not installed.
+
+    :param backend: 'auto', 'orjson', 'msgspec' or 'json'
+    :param logger: logging.Logger instance
+    :return: JsonDecoder instance
+    """
+
+    try:
+        decoder = JsonDecoder(backend)
+    except ImportError as e:
+        if logger:
+            logger.warning(f'{e} :: falling back to stdlib json')
+        decoder = JsonDecoder('json')
+
+    if logger:
+        logger.info(f'JSON decoder:: {decoder.backend}')
+
+    return decoder
@@ -0,0 +1,168 @@
+import random
+import threading
+from collections import deque
+from time import monotonic
+
+
+class ProxyHealth:
+    """
+    Health statistics of a single proxy.
+    """
+
+    def __init__(self, proxy: str, recent_size: int = 20):
+        """
+        :param proxy: Proxy string
+        :param recent_size: number of recent status codes to keep
+        """
+
+        self.proxy = proxy
+
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+
+        # exponentially weighted moving averages
+        self.success_rate = 1.0
+        self.latency = None
+
+        self.recent_status_codes = deque(maxlen=recent_size)
+
+        # circuit breaker state: closed (0), open until `opened_until`
+        self.opened_until = 0
+
+
+class ProxyManager:
+    """
+    Health-scored proxy selection with circuit breaking.
+    Every response updates success rate and latency EWMA of its proxy,
+    selection is weighted by `success_rate / latency`. After `failure_threshold`
+    consecutive failures the proxy circuit is opened for `cooldown` seconds.
+    After cooldown the proxy is half-open: first success closes circuit,
+    first failure opens it again.
+    """
+
+    failure_status_codes = (403, 429)
+
+    def __init__(self, base_proxy: list, logger, failure_threshold: int = 5, cooldown: float = 60, alpha: float = 0.2, min_weight: float = 0.01):
+        """
+        :param base_proxy: List of proxies
+        :param logger: logging.Logger instance
+        :param failure_threshold: number of consecutive failures that opens circuit
+        :param cooldown: seconds circuit stays open
+        :param alpha: EWMA smoothing factor
+        :param min_weight: lowest selection weight of a healthy (closed circuit) proxy
+        """
+
+        self.logger = logger
+
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.min_weight = min_weight
+
+        self.lock = threading.Lock()
+        self.health = {proxy: ProxyHealth(proxy) for proxy in dict.fromkeys(base_proxy)}
+
+    def is_failure(self, status_code: int) -> bool:
+        """
+        Decide whether response status indicates proxy problem.
+
+        :param status_code: response status code (None for network errors and timeouts)
+        :return: True if response counts as proxy failure
+        """
+
+        return status_code is None or status_code in self.failure_status_codes or status_code >= 500
+
+    def get_weight(self, health: ProxyHealth) -> float:
+        """
+        Selection weight of a proxy.
+
+        :param health: ProxyHealth object
+        :return: weight value
+        """
+
+        latency = health.latency if health.latency else 1.0
+        return max(health.success_rate, self.min_weight) / max(latency, 0.05)
+
+    def select(self, candidates: list = None):
+        """
+        Pick a proxy with probability proportional to its health.
+        Proxies with open circuit are skipped; if every circuit is open,
+        the one closest to the end of cooldown is returned.
+
+        :param candidates: optional subset of proxies to choose from
+        :return: Proxy string
+        """
+
+        now = monotonic()
+
+        with self.lock:
+            pool = [self.health[proxy] for proxy in candidates if proxy in self.health] if candidates else list(self.health.values())
+            if not pool:
+                return random.choice(candidates) if candidates else None
+
+            available = [health for health in pool if health.opened_until <= now]
+            if not available:
+                return min(pool, key=lambda health: health.opened_until).proxy
+
+            weights = [self.get_weight(health) for health in available]
+
+        return random.choices(available, weights=weights)[0].proxy
+
+    def record(self, proxy: str, status_code: int = None, latency: float = None):
+        """
+        Record the outcome of a request made through the proxy.
+
+        :param proxy: Proxy string
+        :param status_code: response status code (None for network errors and timeouts)
+        :param latency: request duration in seconds
+        """
+
+        is_failure = self.is_failure(status_code)
+
+        with self.lock:
+            health = self.health.get(proxy)
+            if health is None:
+                health = self.health[proxy] = ProxyHealth(proxy)
+
+            health.recent_status_codes.append(status_code)
+            health.success_rate = (1 - self.alpha) * health.success_rate + self.alpha * (0.0 if is_failure else 1.0)
+
+            if latency is not None:
+                health.latency = latency if health.latency is None else (1 - self.alpha) * health.latency + self.alpha * latency
+
+            if not is_failure:
+                health.successes += 1
+                health.consecutive_failures = 0
+                health.opened_until = 0
+                return
+
+            health.failures += 1
+            health.consecutive_failures += 1
+
+            # half-open trial failed or threshold reached: (re)open circuit
+            if health.consecutive_failures >= self.failure_threshold:
+                health.opened_until = monotonic() + self.cooldown
+                self.logger.warning(f"Proxy circuit opened for {self.cooldown}s:: {proxy} :: recent statuses:: {list(health.recent_status_codes)}")
+
+    def get_stats(self) -> list[dict]:
+        """
+        Snapshot of proxies health.
+
+        :return: list of dictionaries with proxy statistics
+        """
+
+        now = monotonic()
+
+        with self.lock:
+            return [
+                {
+                    'proxy': health.proxy,
+                    'successes': health.successes,
+                    'failures': health.failures,
+                    'success_rate': round(health.success_rate, 3),
+                    'latency': round(health.latency, 3) if health.latency is not None else None,
+                    'is_open': health.opened_until > now,
+                }
+                for health in self.health.values()
+            ]
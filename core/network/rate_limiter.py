@@ -0,0 +1,167 @@
+import asyncio
+import threading
+from time import monotonic
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, up to `burst` tokens stored.
+    Not thread-safe on its own, guarded by ProxyRateLimiter lock.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        """
+        :param rate: refill rate in tokens per second
+        :param burst: bucket capacity
+        """
+
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = monotonic()
+
+    def refill(self):
+        """
+        Add tokens accumulated since last update.
+        """
+
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        """
+        Time to wait until one token is available.
+
+        :return: seconds to wait (0 if token is available right now)
+        """
+
+        self.refill()
+        if self.tokens >= 1:
+            return 0
+
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """
+        Take one token from the bucket.
+        """
+
+        self.tokens -= 1
+
+
+class ProxyRateLimiter:
+    """
+    Per-proxy rate limiter shared by scrapers.
+    Each proxy gets its own token bucket and in-flight requests cap,
+    so callers wait only on the proxy they picked.
+    """
+
+    def __init__(self, rate: float = None, burst: float = None, max_in_flight: int = None, logger=None):
+        """
+        :param rate: allowed requests per second per proxy (None disables token bucket)
+        :param burst: token bucket capacity (defaults to rate)
+        :param max_in_flight: maximum number of simultaneous requests per proxy (None disables cap)
+        :param logger: logging.Logger instance
+        """
+
+        self.rate = rate
+        self.burst = burst or rate
+        self.max_in_flight = max_in_flight
+        self.logger = logger
+
+        self.condition = threading.Condition()
+
+        # proxy -> TokenBucket / number of in-flight requests
+        self.buckets = {}
+        self.in_flight = {}
+
+    def try_acquire(self, proxy: str):
+        """
+        Try to take an in-flight slot and a token for the proxy without blocking.
+        Must be called with condition lock held.
+
+        :param proxy: Proxy string
+        :return: 0 if acquired, seconds to wait for next token, or None if in-flight cap is reached
+        """
+
+        if self.max_in_flight and self.in_flight.get(proxy, 0) >= self.max_in_flight:
+            return None
+
+        if self.rate:
+            bucket = self.buckets.get(proxy)
+            if bucket is None:
+                bucket = self.buckets[proxy] = TokenBucket(self.rate, self.burst)
+
+            wait_time = bucket.wait_time()
+            if wait_time > 0:
+                return wait_time
+
+            bucket.consume()
+
+        self.in_flight[proxy] = self.in_flight.get(proxy, 0) + 1
+        return 0
+
+    def acquire(self, proxy: str, timeout: float = None) -> bool:
+        """
+        Block until the proxy has both a free in-flight slot and a token.
+
+        :param proxy: Proxy string
+        :param timeout: optional maximum waiting time in seconds
+        :return: True if acquired, False on timeout
+        """
+
+        deadline = None if timeout is None else monotonic() + timeout
+
+        with self.condition:
+            while True:
+                wait_time = self.try_acquire(proxy)
+                if wait_time == 0:
+                    return True
+
+                if deadline is not None:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait_time = remaining if wait_time is None else min(wait_time, remaining)
+
+                # woken earlier by release() when in-flight slot is freed
+                self.condition.wait(wait_time)
+
+    async def acquire_async(self, proxy: str, poll_interval: float = 0.05):
+        """
+        Awaitable counterpart of acquire for asyncio engine.
+
+        :param proxy: Proxy string
+        :param poll_interval: waiting step when in-flight cap is reached
+        """
+
+        while True:
+            with self.condition:
+                wait_time = self.try_acquire(proxy)
+
+            if wait_time == 0:
+                return True
+
+            await asyncio.sleep(poll_interval if wait_time is None else wait_time)
+
+    def release(self, proxy: str):
+        """
+        Free in-flight slot of the proxy.
+
+        :param proxy: Proxy string
+        """
+
+        with self.condition:
+            self.in_flight[proxy] = max(self.in_flight.get(proxy, 1) - 1, 0)
+            self.condition.notify_all()
+
+    def get_stats(self) -> dict:
+        """
+        Current in-flight requests per proxy.
+
+        :return: dictionary proxy -> number of in-flight requests
+        """
+
+        with self.condition:
+            return dict(self.in_flight)
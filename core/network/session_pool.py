@@ -0,0 +1,329 @@
+import random
+import threading
+from time import monotonic
+
+import requests
+
+
+class PooledSession:
+    """
+    Warmed requests session checked out from SessionPool.
+    """
+
+    def __init__(self, session: requests.Session, key: tuple):
+        """
+        :param session: requests.Session object with proxy, headers and cookies set
+        :param key: (proxy, user agent) pair the session is bound to
+        """
+
+        self.session = session
+        self.key = key
+        self.proxy = key[0]
+        self.failures = 0
+        self.checked_out_at = None
+
+
+class SessionPool:
+    """
+    Pool of warmed requests sessions shared by scrapers.
+    Sessions are keyed by (proxy, user agent). Cookies received on the homepage
+    warm-up are reused for new sessions of the same key until `ttl` expires,
+    so only the first session of a key pays for a homepage download.
+    Sessions hitting repeated 403/429 responses are evicted together with their cookies.
+    When rate limiter is provided, checkout waits for a token and in-flight slot
+    of the session proxy, and checkin frees the slot.
+    When proxy manager is provided, proxies are picked by health and every
+    checkin reports response status and latency back to it.
+    """
+
+    ban_status_codes = (403, 429)
+
+    def __init__(self, base_url: str, base_headers: dict, base_proxy: list, base_user_agents: list, logger, ttl: int = 900, max_failures: int = 3, sessions_per_key: int = 5, max_retries: int = 5, timeout: int = 15, rate_limiter=None, proxy_manager=None):
+        """
+        Initialize session pool.
+
+        :param base_url: Base URL used for session warm-up
+        :param base_headers: Default HTTP headers
+        :param base_proxy: List of proxies
+        :param base_user_agents: List of user-agent headers
+        :param logger: Logger instance for tracking execution
+        :param ttl: Lifetime of warmed cookies in seconds
+        :param max_failures: Number of consecutive 403/429 responses before session eviction
+        :param sessions_per_key: Maximum number of live sessions sharing one (proxy, user agent) key
+        :param max_retries: Number of warm-up attempts
+        :param timeout: Warm-up request timeout in seconds
+        :param rate_limiter: Optional ProxyRateLimiter; a checked out session holds one request slot of its proxy
+        :param proxy_manager: Optional ProxyManager used for health weighted proxy selection
+        """
+
+        self.logger = logger
+
+        self.base_url = base_url
+        self.base_headers = base_headers
+        self.base_proxy = base_proxy
+        self.base_user_agents = base_user_agents
+
+        self.ttl = ttl
+        self.max_failures = max_failures
+        self.sessions_per_key = sessions_per_key
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.proxy_manager = proxy_manager
+
+        self.lock = threading.Lock()
+
+        # key -> list of idle PooledSession objects
+        self.idle = {}
+        # key -> (cookies dict, warmed at)
+        self.warm_cookies = {}
+        # key -> number of live (idle and checked out) sessions
+        self.live = {}
+
+        # statistics
+        self.warmups = 0
+        self.evictions = 0
+
+    def get_random_proxy(self):
+        """
+        Select a proxy from the available pool (health weighted if proxy manager is set).
+
+        :return: Proxy string
+        """
+
+        if self.proxy_manager:
+            return self.proxy_manager.select()
+
+        return random.choice(self.base_proxy)
+
+    def get_random_user_agent(self) -> int:
+        """
+        Select a random user-agent headers set.
+
+        :return: Index of headers set in base_user_agents
+        """
+
+        return random.randrange(len(self.base_user_agents))
+
+    def get_random_headers(self, user_agent: int = None):
+        """
+        Generate request headers with a random (or given) user-agent.
+
+        :param user_agent: Optional index of headers set in base_user_agents
+        :return: Updated HTTP headers
+        """
+
+        if user_agent is None:
+            user_agent = self.get_random_user_agent()
+
+        headers = self.base_headers.copy()
+        headers.update(self.base_user_agents[user_agent])
+
+        return headers
+
+    def is_fresh(self, warmed_at: float) -> bool:
+        """
+        Check whether cookies warmed at the given moment are still valid.
+
+        :param warmed_at: monotonic time of warm-up
+        :return: True if ttl is not expired
+        """
+
+        return monotonic() - warmed_at < self.ttl
+
+    def pick_key(self, proxy: str = None):
+        """
+        Pick a key for a new session, preferring warmed keys with free capacity.
+
+        :param proxy: Optional proxy the session must be bound to
+        :return: (proxy, user agent) pair
+        """
+
+        with self.lock:
+            warmed = [
+                key for key, (_, warmed_at) in self.warm_cookies.items()
+                if self.is_fresh(warmed_at) and self.live.get(key, 0) < self.sessions_per_key and (proxy is None or key[0] == proxy)
+            ]
+
+        if warmed:
+            return random.choice(warmed)
+
+        return proxy or self.get_random_proxy(), self.get_random_user_agent()
+
+    def create_session(self, key: tuple):
+        """
+        Create a session for the key, reusing warmed cookies or warming it up with the homepage.
+
+        :param key: (proxy, user agent) pair
+        :return: PooledSession object on success, False on failure
+        """
+
+        proxy, user_agent = key
+
+        session = requests.Session()
+        session.headers.update(self.get_random_headers(user_agent))
+        session.proxies.update({
+            'http': proxy,
+            'https': proxy,
+        })
+
+        with self.lock:
+            cookies = self.warm_cookies.get(key)
+
+        if cookies and self.is_fresh(cookies[1]):
+            session.cookies.update(cookies[0])
+        else:
+            if self.rate_limiter:
+                self.rate_limiter.acquire(proxy)
+            status_code = None
+            started_at = monotonic()
+            try:
+                self.logger.info(f"Start warming session:: {proxy}")
+                response = session.get(self.base_url, timeout=self.timeout)
+                status_code = response.status_code
+
+                if response.status_code != 200:
+                    raise Exception(f"Not available status code {response.status_code}")
+
+            except Exception as e:
+                self.logger.error(f"Unexpected error on creating session {e}")
+                session.close()
+                return False
+            finally:
+                if self.rate_limiter:
+                    self.rate_limiter.release(proxy)
+                if self.proxy_manager:
+                    self.proxy_manager.record(proxy, status_code, monotonic() - started_at)
+
+            with self.lock:
+                self.warm_cookies[key] = (session.cookies.get_dict(), monotonic())
+                self.warmups += 1
+
+        with self.lock:
+            self.live[key] = self.live.get(key, 0) + 1
+
+        return PooledSession(session, key)
+
+    def checkout(self, proxy: str = None):
+        """
+        Borrow a session from the pool, creating a new one if no idle session is available.
+
+        :param proxy: Optional proxy the session must be bound to
+        :return: PooledSession object on success, False on failure
+        """
+
+        expired = []
+        pooled = None
+
+        # with proxy manager the healthiest proxy is chosen first, idle sessions of other proxies are skipped
+        selected = proxy
+        if selected is None and self.proxy_manager:
+            selected = self.proxy_manager.select()
+
+        with self.lock:
+            for key, sessions in self.idle.items():
+                if selected is not None and key[0] != selected:
+                    continue
+
+                cookies = self.warm_cookies.get(key)
+                if not cookies or not self.is_fresh(cookies[1]):
+                    expired.extend(sessions)
+                    sessions.clear()
+                    continue
+
+                if sessions:
+                    pooled = sessions.pop()
+                    break
+
+        for item in expired:
+            self.discard(item)
+
+        if not pooled:
+            for attempt in range(self.max_retries):
+                # failed warm-up is recorded by proxy manager, a retry selects again and skips opened circuits
+                if attempt and proxy is None and self.proxy_manager:
+                    selected = self.proxy_manager.select()
+
+                pooled = self.create_session(self.pick_key(selected))
+                if pooled:
+                    break
+
+                self.logger.info(f"Cannot create session... Attempt:: {attempt}")
+            else:
+                self.logger.error("Max retries expected...")
+                return False
+
+        # wait only on the proxy of the picked session
+        if self.rate_limiter:
+            self.rate_limiter.acquire(pooled.proxy)
+        pooled.checked_out_at = monotonic()
+        return pooled
+
+    def checkin(self, pooled: PooledSession, status_code: int = None):
+        """
+        Return a session to the pool, evicting it after repeated 403/429 responses.
+
+        :param pooled: PooledSession object obtained by checkout
+        :param status_code: Status code of the last response made with the session (None if request failed)
+        """
+
+        if self.rate_limiter:
+            self.rate_limiter.release(pooled.proxy)
+
+        if self.proxy_manager:
+            self.proxy_manager.record(pooled.proxy, status_code, monotonic() - pooled.checked_out_at)
+
+        if status_code in self.ban_status_codes:
+            pooled.failures += 1
+        elif status_code is not None:
+            pooled.failures = 0
+
+        if pooled.failures >= self.max_failures:
+            self.evict(pooled)
+            return
+
+        with self.lock:
+            self.idle.setdefault(pooled.key, []).append(pooled)
+
+    def discard(self, pooled: PooledSession):
+        """
+        Close a session and release its key capacity.
+
+        :param pooled: PooledSession object
+        """
+
+        with self.lock:
+            self.live[pooled.key] = max(self.live.get(pooled.key, 1) - 1, 0)
+
+        pooled.session.close()
+
+    def evict(self, pooled: PooledSession):
+        """
+        Drop a banned session together with its warmed cookies and idle siblings.
+
+        :param pooled: PooledSession object
+        """
+
+        self.logger.warning(f"Evicting session after {pooled.failures} blocked responses:: {pooled.proxy}")
+
+        with self.lock:
+            self.warm_cookies.pop(pooled.key, None)
+            siblings = self.idle.pop(pooled.key, [])
+            self.evictions += 1
+
+        for item in [pooled, *siblings]:
+            self.discard(item)
+
+    def close(self):
+        """
+        Close all idle sessions.
+        """
+
+        with self.lock:
+            sessions = [item for items in self.idle.values() for item in items]
+            self.idle.clear()
+
+        for item in sessions:
+            self.discard(item)
+
+        self.logger.info(f"Session pool closed:: warm-ups:: {self.warmups} / evictions:: {self.evictions}")
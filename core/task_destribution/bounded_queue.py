@@ -0,0 +1,134 @@
+import sys
+from collections import deque
+from queue import Queue, Full
+from time import monotonic
+
+
+def estimate_size(item) -> int:
+    """
+    Cheap estimation of memory used by a queued result.
+    Objects may report their own size with `nbytes` attribute,
+    dictionaries are measured one level deep (plus list values).
+
+    :param item: queued object
+    :return: estimated size in bytes
+    """
+
+    nbytes = getattr(item, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+
+    size = sys.getsizeof(item)
+    if isinstance(item, dict):
+        for value in item.values():
+            size += sys.getsizeof(value)
+            if isinstance(value, list):
+                size += sum(sys.getsizeof(element) for element in value)
+
+    return size
+
+
+class BoundedResultsQueue(Queue):
+    """
+    Results queue bounded by number of items and/or estimated bytes.
+    Producers block on put while the queue is over budget, so parsing slows
+    down when the writer falls behind instead of growing memory without limit.
+    """
+
+    def __init__(self, maxsize: int = 0, max_bytes: int = 0, size_estimator=None):
+        """
+        :param maxsize: maximum number of queued items (0 - unlimited)
+        :param max_bytes: maximum estimated size of queued items in bytes (0 - unlimited)
+        :param size_estimator: callable returning item size in bytes
+        """
+
+        self.max_bytes = max_bytes
+        self.size_estimator = size_estimator or estimate_size
+
+        # metrics
+        self.bytes = 0
+        self.high_water_items = 0
+        self.high_water_bytes = 0
+        self.blocked_puts = 0
+        self.blocked_time = 0.0
+
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        super()._init(maxsize)
+        self.sizes = deque()
+
+    def _put(self, item):
+        size = self.size_estimator(item) if self.max_bytes else 0
+        self.queue.append(item)
+        self.sizes.append(size)
+
+        self.bytes += size
+        self.high_water_items = max(self.high_water_items, len(self.queue))
+        self.high_water_bytes = max(self.high_water_bytes, self.bytes)
+
+    def _get(self):
+        self.bytes -= self.sizes.popleft()
+        return self.queue.popleft()
+
+    def is_over_budget(self) -> bool:
+        """
+        Check whether a new item has to wait. Must be called with queue mutex held.
+        Empty queue always accepts an item, so a single huge item cannot dead-lock producers.
+
+        :return: True if queue is full
+        """
+
+        if not self.queue:
+            return False
+
+        if 0 < self.maxsize <= len(self.queue):
+            return True
+
+        return 0 < self.max_bytes <= self.bytes
+
+    def put(self, item, block=True, timeout=None):
+        """
+        Put an item into the queue, blocking while the queue is over items or bytes budget.
+
+        :param item: result to queue
+        :param block: wait for free space if True, raise Full immediately otherwise
+        :param timeout: optional maximum waiting time in seconds
+        """
+
+        with self.not_full:
+            if self.is_over_budget():
+                if not block:
+                    raise Full
+
+                started_at = monotonic()
+                self.blocked_puts += 1
+                try:
+                    while self.is_over_budget():
+                        remaining = None if timeout is None else timeout - (monotonic() - started_at)
+                        if remaining is not None and remaining <= 0:
+                            raise Full
+                        self.not_full.wait(remaining)
+                finally:
+                    self.blocked_time += monotonic() - started_at
+
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def get_metrics(self) -> dict:
+        """
+        Queue depth and backpressure metrics.
+
+        :return: dictionary with metrics
+        """
+
+        with self.mutex:
+            return {
+                'depth': len(self.queue),
+                'bytes': self.bytes,
+                'high_water_items': self.high_water_items,
+                'high_water_bytes': self.high_water_bytes,
+                'blocked_puts': self.blocked_puts,
+                'blocked_time': round(self.blocked_time, 2),
+            }
@@ -0,0 +1,92 @@
+import math
+from datetime import datetime
+
+
+class IncrementalScheduler:
+    """
+    Selects categories for an incremental recrawl within a request budget.
+    Every category has a change rate (price/availability changes per product per day)
+    estimated from previous visits; expected number of changed products since the last
+    visit is `products * (1 - exp(-rate * days))`. Categories are taken by expected
+    change per request (page) until the budget is spent, so high-churn categories are
+    visited often and stable ones only when enough time has passed.
+    Categories without statistics are always scheduled.
+    """
+
+    def __init__(self, request_budget: int, default_change_rate: float = 0.05, min_change_rate: float = 0.001, logger=None):
+        """
+        :param request_budget: maximum number of page requests of the run
+        :param default_change_rate: change rate of categories visited only once
+        :param min_change_rate: lowest change rate, so stable categories are revisited eventually
+        :param logger: logging.Logger instance
+        """
+
+        self.request_budget = request_budget
+        self.default_change_rate = default_change_rate
+        self.min_change_rate = min_change_rate
+        self.logger = logger
+
+    def get_change_rate(self, stats: dict) -> float:
+        """
+        Observed changes per product per day.
+
+        :param stats: category statistics
+        :return: change rate
+        """
+
+        if not stats.get('product_days'):
+            return self.default_change_rate
+
+        return max(stats['changed_products'] / stats['product_days'], self.min_change_rate)
+
+    def get_score(self, stats: dict, now: datetime) -> float:
+        """
+        Expected number of changed products per page request if visited now.
+
+        :param stats: category statistics
+        :param now: current time
+        :return: score
+        """
+
+        days = max((now - stats['last_scraped_at']).total_seconds() / 86400, 0)
+        pages = max(stats.get('number_of_pages') or 1, 1)
+        expected = (stats.get('products') or 0) * (1 - math.exp(-self.get_change_rate(stats) * days))
+
+        return expected / pages
+
+    def select(self, tasks: list[dict], category_stats: dict) -> list[dict]:
+        """
+        Choose category tasks for the run.
+
+        :param tasks: category tasks (with `id`)
+        :param category_stats: dictionary category_id -> statistics (DB.get_category_stats)
+        :return: selected tasks
+        """
+
+        now = datetime.now()
+
+        selected = []
+        scored = []
+        budget = self.request_budget
+
+        for task in tasks:
+            stats = category_stats.get(task.get('id'))
+            if not stats:
+                # unknown category: first page tells its size
+                selected.append(task)
+                budget -= 1
+                continue
+
+            scored.append((self.get_score(stats, now), max(stats.get('number_of_pages') or 1, 1), task))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        for score, pages, task in scored:
+            if pages > budget:
+                continue
+            selected.append(task)
+            budget -= pages
+
+        if self.logger:
+            self.logger.info(f"Incremental schedule:: selected {len(selected)}/{len(tasks)} categories :: budget left:: {budget}/{self.request_budget}")
+
+        return selected
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from time import monotonic
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease concurrency controller.
+    Works as a drop-in replacement of ThreadingBase.block semaphore: consumers
+    call acquire/release, but the number of slots (window) changes during the run.
+    Healthy responses grow window by `increase` per window of responses,
+    429/5xx responses and timeouts shrink it by `decrease_factor`.
+    """
+
+    congestion_status_codes = (429,)
+
+    def __init__(self, initial: int = 10, min_window: int = 1, max_window: int = 20, increase: float = 1.0, decrease_factor: float = 0.5, latency_threshold: float = None, decrease_interval: float = 1.0, logger=None):
+        """
+        :param initial: starting window
+        :param min_window: lowest window
+        :param max_window: highest window (should not exceed number of workers)
+        :param increase: window growth per full window of healthy responses
+        :param decrease_factor: window multiplier on congestion signal
+        :param latency_threshold: seconds; slower successful responses do not grow window
+        :param decrease_interval: minimal seconds between two decreases, so a burst of failures of one round shrinks window once
+        :param logger: logging.Logger instance
+        """
+
+        self.min_window = min_window
+        self.max_window = max_window
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_threshold = latency_threshold
+        self.decrease_interval = decrease_interval
+        self.logger = logger
+
+        self.current = float(min(max(initial, min_window), max_window))
+        self.in_flight = 0
+        self.last_decrease_at = 0
+
+        self.condition = threading.Condition()
+
+    @property
+    def window(self) -> int:
+        """
+        Current number of allowed in-flight tasks.
+        """
+
+        return int(self.current)
+
+    def acquire(self):
+        """
+        Block until number of in-flight tasks is below current window.
+        """
+
+        with self.condition:
+            while self.in_flight >= self.window:
+                self.condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self, poll_interval: float = 0.05):
+        """
+        Awaitable counterpart of acquire for asyncio engine.
+
+        :param poll_interval: waiting step while window is full
+        """
+
+        while True:
+            with self.condition:
+                if self.in_flight < self.window:
+                    self.in_flight += 1
+                    return
+
+            await asyncio.sleep(poll_interval)
+
+    def release(self):
+        """
+        Free in-flight slot.
+        """
+
+        with self.condition:
+            self.in_flight = max(self.in_flight - 1, 0)
+            self.condition.notify_all()
+
+    def is_congestion(self, status_code: int) -> bool:
+        """
+        Decide whether response status is a congestion signal.
+
+        :param status_code: response status code (None for network errors and timeouts)
+        :return: True if window should shrink
+        """
+
+        return status_code is None or status_code in self.congestion_status_codes or status_code >= 500
+
+    def record(self, status_code: int = None, latency: float = None):
+        """
+        Adjust window after a response.
+
+        :param status_code: response status code (None for network errors and timeouts)
+        :param latency: request duration in seconds
+        """
+
+        with self.condition:
+            if self.is_congestion(status_code):
+                now = monotonic()
+                if now - self.last_decrease_at < self.decrease_interval:
+                    return
+
+                self.last_decrease_at = now
+                previous = self.window
+                self.current = max(self.current * self.decrease_factor, self.min_window)
+                if self.logger and previous != self.window:
+                    self.logger.warning(f'concurrency window decreased:: {previous} -> {self.window} :: status:: {status_code}')
+                return
+
+            if status_code >= 400:
+                return
+
+            if self.latency_threshold and latency is not None and latency > self.latency_threshold:
+                return
+
+            # grows by `increase` after a full window of healthy responses
+            self.current = min(self.current + self.increase / self.current, self.max_window)
+            self.condition.notify_all()
@@ -0,0 +1,430 @@
+import json
+import os
+import random
+import socket
+import threading
+from queue import Empty
+from time import sleep, monotonic
+
+try:
+    from core.task_destribution.retry_queue import get_backoff_delay
+except ImportError as ie:
+    exit(f'failed to import retry queue module:: {ie}')
+
+
+class PostgresTaskQueue:
+    """
+    Distributed tasks queue stored in bigbasket.task_queue table.
+    Any number of worker processes on different hosts share one run (`run_id`):
+    - tasks are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so workers never block each other
+    - claimed task becomes invisible for `visibility_timeout` seconds; a heartbeat thread
+      extends it while the task is processed, so tasks of a dead worker become visible again
+    - tasks are acknowledged (done) only after their results are saved, so results queued in memory
+      of a crashed worker are scraped again by others
+    - tasks are deduplicated by key within a run, so seeding the same input on every node is safe
+    - failed tasks are delayed in the table itself (backoff with jitter, local retry budget)
+
+    Implements the parts of Queue interface used by ThreadingBase (put, get, task_done,
+    unfinished_tasks, qsize) and the RetryQueue interface, so one instance serves as both.
+    """
+
+    def __init__(self, db, run_id: str, visibility_timeout: float = 300, heartbeat_interval: float = 30, idle_poll_interval: float = 0.2, max_idle_poll_interval: float = 5, base_delay: float = 1.5, max_delay: float = 60.0, budget_ratio: float = 0.2, min_budget: int = 50, worker_id: str = None, logger=None):
+        """
+        :param db: DB instance (connections are borrowed from its pool)
+        :param run_id: identifier of the shared run
+        :param visibility_timeout: seconds a claimed task stays invisible without heartbeat
+        :param heartbeat_interval: seconds between claim extensions of in-flight tasks
+        :param idle_poll_interval: shortest delay between claims when nothing is visible
+        :param max_idle_poll_interval: upper bound of delay between empty claims
+        :param base_delay: delay of the first retry in seconds
+        :param max_delay: upper bound of retry delay before jitter
+        :param budget_ratio: allowed retries per first attempt (per worker process)
+        :param min_budget: retries always allowed regardless of ratio
+        :param worker_id: identifier of this worker process (host:pid by default)
+        :param logger: logging.Logger instance
+        """
+
+        self.db = db
+        self.run_id = run_id
+        self.visibility_timeout = visibility_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_poll_interval = idle_poll_interval
+        self.max_idle_poll_interval = max_idle_poll_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.min_budget = min_budget
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.logger = logger
+
+        self.lock = threading.Lock()
+
+        # keys of tasks claimed by this worker and not finished yet
+        self.in_flight = set()
+
+        # start of the current idle period of this worker process (no task visible), None while busy
+        self.idle_since = None
+
+        # statuses -> (counted at, number of tasks), shared by idle consumers
+        self.counts = {}
+
+        # retry budget counters
+        self.first_attempts = 0
+        self.retries = 0
+        self.rejected = 0
+
+        self.heartbeat_thread = None
+        self.is_closed = threading.Event()
+
+    def get_task_key(self, task) -> str:
+        """
+        Deduplication key of a task (attempt number is not part of task identity).
+
+        :param task: task dictionary
+        :return: key string
+        """
+
+        return json.dumps({k: v for k, v in task.items() if k != 'attempt'}, sort_keys=True, default=str)
+
+    def execute(self, query, params=None, fetch=False):
+        """
+        Run a single statement in its own transaction.
+
+        :param query: SQL query
+        :param params: query parameters
+        :param fetch: return fetched rows
+        :return: list of rows / affected rows count
+        """
+
+        conn = self.db.borrow_connection()
+        if not conn:
+            raise ConnectionError('failed to establish database connection')
+
+        is_failed = False
+        try:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                result = cur.fetchall() if fetch else cur.rowcount
+            conn.commit()
+            return result
+        except Exception:
+            is_failed = True
+            raise
+        finally:
+            self.db.release_connection(conn, discard=is_failed)
+
+    def put(self, task, block=True, timeout=None):
+        """
+        Add a task to the run (ignored if a task with the same key already exists).
+
+        :param task: task dictionary
+        """
+
+        self.put_many([task])
+
+    def put_many(self, tasks):
+        """
+        Add multiple tasks with one statement.
+
+        :param tasks: list of task dictionaries
+        :return: number of added tasks
+        """
+
+        if not tasks:
+            return 0
+
+        values = [(self.run_id, self.get_task_key(task), json.dumps(task, default=str)) for task in tasks]
+        signs = ','.join(['(%s, %s, %s)'] * len(values))
+
+        return self.execute(
+            f"""
+            INSERT INTO bigbasket.task_queue (run_id, task_key, payload)
+            VALUES {signs}
+            ON CONFLICT (run_id, task_key) DO NOTHING
+            """,
+            [value for row in values for value in row]
+        )
+
+    def claim(self):
+        """
+        Claim the oldest visible task of the run.
+
+        :return: task dictionary OR None if nothing is visible
+        """
+
+        rows = self.execute(
+            """
+            UPDATE bigbasket.task_queue
+            SET status = 'claimed',
+                claimed_by = %s,
+                attempts = attempts + 1,
+                visible_at = now() + %s * interval '1 second',
+                updated_at = now()
+            WHERE id = (
+                SELECT id FROM bigbasket.task_queue
+                WHERE run_id = %s AND status <> 'done' AND visible_at <= now()
+                ORDER BY visible_at
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING task_key, payload
+            """,
+            (self.worker_id, self.visibility_timeout, self.run_id),
+            fetch=True
+        )
+
+        if not rows:
+            with self.lock:
+                self.idle_since = self.idle_since or monotonic()
+            return None
+
+        task_key, payload = rows[0]
+        with self.lock:
+            self.idle_since = None
+            self.in_flight.add(task_key)
+
+        self.start_heartbeat()
+        return payload
+
+    def get_idle_delay(self, jitter: bool = True) -> float:
+        """
+        Delay before the next claim after nothing was visible: half of the time the process
+        has been idle (bounded by idle_poll_interval and max_idle_poll_interval), reset by a successful claim.
+        Does not depend on the number of consumers polling.
+
+        :param jitter: randomize delay, so idle workers do not poll in lockstep
+        :return: delay in seconds
+        """
+
+        with self.lock:
+            idle_time = monotonic() - self.idle_since if self.idle_since else 0
+
+        delay = min(max(self.idle_poll_interval, idle_time / 2), self.max_idle_poll_interval)
+        return delay * random.uniform(0.5, 1.5) if jitter else delay
+
+    def get(self, block=True, timeout=None):
+        """
+        Claim a task, waiting when nothing is visible (at least `timeout` seconds, longer while queue stays idle).
+
+        :param block: wait if True
+        :param timeout: waiting time in seconds
+        :return: task dictionary
+        """
+
+        task = self.claim()
+        if task is not None:
+            return task
+
+        if block:
+            sleep(max(timeout or 0, self.get_idle_delay()))
+        raise Empty
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def task_done(self, task=None):
+        """
+        Acknowledge a processed task. Task rescheduled for retry is left pending.
+
+        :param task: claimed task dictionary
+        """
+
+        if task is None:
+            return
+
+        self.task_done_many([task])
+
+    def task_done_many(self, tasks):
+        """
+        Acknowledge processed tasks with one statement.
+
+        :param tasks: list of claimed task dictionaries
+        :return: number of acknowledged tasks
+        """
+
+        if not tasks:
+            return 0
+
+        keys = [self.get_task_key(task) for task in tasks]
+        with self.lock:
+            self.in_flight.difference_update(keys)
+
+        return self.execute(
+            """
+            UPDATE bigbasket.task_queue
+            SET status = 'done', updated_at = now()
+            WHERE run_id = %s AND task_key = ANY(%s) AND claimed_by = %s AND status = 'claimed'
+            """,
+            (self.run_id, keys, self.worker_id)
+        )
+
+    def release(self, tasks):
+        """
+        Stop extending claims of tasks that could not be completed (e.g. their results were not saved).
+        Tasks stay claimed and become visible to all workers when visibility timeout expires.
+
+        :param tasks: list of claimed task dictionaries
+        """
+
+        with self.lock:
+            self.in_flight.difference_update(self.get_task_key(task) for task in tasks)
+
+    def heartbeat(self):
+        """
+        Keep in-flight tasks of this worker invisible while they are processed.
+        """
+
+        while not self.is_closed.wait(self.heartbeat_interval):
+            with self.lock:
+                keys = list(self.in_flight)
+
+            if not keys:
+                continue
+
+            try:
+                self.execute(
+                    """
+                    UPDATE bigbasket.task_queue
+                    SET visible_at = now() + %s * interval '1 second'
+                    WHERE run_id = %s AND claimed_by = %s AND status = 'claimed' AND task_key = ANY(%s)
+                    """,
+                    (self.visibility_timeout, self.run_id, self.worker_id, keys)
+                )
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f'task queue heartbeat failed:: {e}')
+
+    def start_heartbeat(self):
+        """
+        Start heartbeat thread on first claim.
+        """
+
+        with self.lock:
+            if self.heartbeat_thread is not None:
+                return
+            self.heartbeat_thread = threading.Thread(target=self.heartbeat, daemon=True)
+
+        self.heartbeat_thread.start()
+
+    def close(self):
+        """
+        Stop heartbeat thread.
+        """
+
+        self.is_closed.set()
+        if self.heartbeat_thread:
+            self.heartbeat_thread.join()
+
+    def count(self, statuses, max_age: float = 0) -> int:
+        """
+        Number of tasks of the run in given statuses.
+
+        :param statuses: tuple of statuses
+        :param max_age: seconds a previously counted value may be reused
+        :return: number of tasks
+        """
+
+        key = tuple(statuses)
+        if max_age > 0:
+            with self.lock:
+                counted_at, count = self.counts.get(key, (None, None))
+            if counted_at is not None and monotonic() - counted_at < max_age:
+                return count
+
+        counted_at = monotonic()
+        rows = self.execute(
+            "SELECT count(*) FROM bigbasket.task_queue WHERE run_id = %s AND status = ANY(%s)",
+            (self.run_id, list(statuses)),
+            fetch=True
+        )
+
+        with self.lock:
+            self.counts[key] = (counted_at, rows[0][0])
+        return rows[0][0]
+
+    @property
+    def unfinished_tasks(self) -> int:
+        """
+        Tasks of the run not done by any worker (including claims of dead workers).
+        Checked by every idle consumer, so one count is shared for the current idle delay.
+        """
+
+        return self.count(('pending', 'claimed'), max_age=self.get_idle_delay(jitter=False))
+
+    def qsize(self) -> int:
+        return self.count(('pending',))
+
+    # RetryQueue interface: delayed tasks wait in the table, nothing is kept in memory
+
+    def __len__(self):
+        return 0
+
+    def record_attempt(self):
+        """
+        Register a first attempt of a task (grows retry budget).
+        """
+
+        with self.lock:
+            self.first_attempts += 1
+
+    def schedule(self, task, attempt: int) -> bool:
+        """
+        Return a failed task to pending state, visible after backoff delay.
+
+        :param task: task to retry
+        :param attempt: number of already failed attempts of the task
+        :return: True if scheduled, False if budget is exhausted
+        """
+
+        with self.lock:
+            if self.retries >= self.min_budget + self.budget_ratio * self.first_attempts:
+                self.rejected += 1
+                return False
+            self.retries += 1
+
+        delay = get_backoff_delay(attempt - 1, self.base_delay, self.max_delay)
+        task_key = self.get_task_key(task)
+
+        with self.lock:
+            self.in_flight.discard(task_key)
+
+        self.execute(
+            """
+            UPDATE bigbasket.task_queue
+            SET status = 'pending',
+                payload = %s,
+                claimed_by = NULL,
+                visible_at = now() + %s * interval '1 second',
+                updated_at = now()
+            WHERE run_id = %s AND task_key = %s
+            """,
+            (json.dumps(task, default=str), delay, self.run_id, task_key)
+        )
+        return True
+
+    def release_ready(self, put) -> int:
+        # delayed tasks become visible in the table by themselves
+        return 0
+
+    def get_stats(self) -> dict:
+        """
+        Retry budget of this worker and task counters of the run.
+
+        :return: dictionary with counters
+        """
+
+        rows = self.execute(
+            "SELECT status, count(*) FROM bigbasket.task_queue WHERE run_id = %s GROUP BY status",
+            (self.run_id,),
+            fetch=True
+        )
+
+        with self.lock:
+            stats = {
+                'first_attempts': self.first_attempts,
+                'retries': self.retries,
+                'rejected': self.rejected,
+            }
+
+        stats.update({status: count for status, count in rows})
+        return stats
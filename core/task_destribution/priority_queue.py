@@ -0,0 +1,34 @@
+import heapq
+from itertools import count
+from queue import Queue
+
+
+class PriorityTaskQueue(Queue):
+    """
+    Tasks queue ordered by a priority key (lowest first), FIFO among equal priorities.
+    Priority is computed when a task is put, so follow-up tasks and retries
+    are ordered with the knowledge available at that moment.
+    """
+
+    def __init__(self, key, maxsize: int = 0):
+        """
+        :param key: callable returning sortable priority of a task
+        :param maxsize: maximum number of queued tasks (0 - unlimited)
+        """
+
+        self.key = key
+        self.sequence = count()
+
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self.queue = []
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, item):
+        heapq.heappush(self.queue, (self.key(item), next(self.sequence), item))
+
+    def _get(self):
+        return heapq.heappop(self.queue)[-1]
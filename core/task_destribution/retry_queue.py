@@ -0,0 +1,121 @@
+import heapq
+import random
+import threading
+from itertools import count
+from time import monotonic
+
+
+def get_backoff_delay(attempt: int, base_delay: float = 1.5, max_delay: float = 60.0) -> float:
+    """
+    Exponential backoff with jitter: base_delay * 2 ** attempt, capped by max_delay,
+    multiplied by a random factor in [0.5, 1.5).
+
+    :param attempt: number of already failed attempts (starting with 0)
+    :param base_delay: delay of the first retry in seconds
+    :param max_delay: upper bound of delay before jitter
+    :return: delay in seconds
+    """
+
+    return min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+class RetryQueue:
+    """
+    Delay queue for failed tasks.
+    Tasks are kept in a heap ordered by ready time, so workers do not sleep
+    between attempts and keep processing other ready tasks.
+    A global retry budget (`min_budget` + `budget_ratio` * first attempts)
+    prevents retry storms from starving first attempts.
+    """
+
+    def __init__(self, base_delay: float = 1.5, max_delay: float = 60.0, budget_ratio: float = 0.2, min_budget: int = 50, logger=None):
+        """
+        :param base_delay: delay of the first retry in seconds
+        :param max_delay: upper bound of retry delay before jitter
+        :param budget_ratio: allowed retries per first attempt
+        :param min_budget: retries always allowed regardless of ratio
+        :param logger: logging.Logger instance
+        """
+
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.min_budget = min_budget
+        self.logger = logger
+
+        self.lock = threading.Lock()
+        self.heap = []
+        self.sequence = count()
+
+        # retry budget counters
+        self.first_attempts = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def __len__(self):
+        with self.lock:
+            return len(self.heap)
+
+    def record_attempt(self):
+        """
+        Register a first attempt of a task (grows retry budget).
+        """
+
+        with self.lock:
+            self.first_attempts += 1
+
+    def schedule(self, task, attempt: int) -> bool:
+        """
+        Put a failed task into delay queue if retry budget allows it.
+
+        :param task: task to retry
+        :param attempt: number of already failed attempts of the task
+        :return: True if scheduled, False if budget is exhausted
+        """
+
+        delay = get_backoff_delay(attempt - 1, self.base_delay, self.max_delay)
+
+        with self.lock:
+            if self.retries >= self.min_budget + self.budget_ratio * self.first_attempts:
+                self.rejected += 1
+                return False
+
+            self.retries += 1
+            heapq.heappush(self.heap, (monotonic() + delay, next(self.sequence), task))
+
+        return True
+
+    def release_ready(self, put) -> int:
+        """
+        Move tasks whose delay expired into the main tasks queue.
+        Put happens under the lock, so a task is always visible either here or in tasks queue.
+
+        :param put: callable putting task into tasks queue
+        :return: number of released tasks
+        """
+
+        released = 0
+        now = monotonic()
+
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                _, _, task = heapq.heappop(self.heap)
+                put(task)
+                released += 1
+
+        return released
+
+    def get_stats(self) -> dict:
+        """
+        Retry budget statistics.
+
+        :return: dictionary with counters
+        """
+
+        with self.lock:
+            return {
+                'first_attempts': self.first_attempts,
+                'retries': self.retries,
+                'rejected': self.rejected,
+                'delayed': len(self.heap),
+            }
@@ -0,0 +1,144 @@
+import math
+import threading
+
+
+class BitmapSeenIndex:
+    """
+    Exact set of non-negative integer ids stored as a chunked bitmap.
+    Only chunks containing ids are allocated (8 KiB per 65536 id range),
+    so dense id ranges take one bit per id and sparse ranges stay cheap.
+    """
+
+    chunk_bits = 16
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.chunks = {}
+        self.count = 0
+
+    def add(self, item: int) -> bool:
+        """
+        Add id to the index.
+
+        :param item: non-negative integer id
+        :return: True if id was not seen before
+        """
+
+        chunk_id, offset = item >> self.chunk_bits, item & ((1 << self.chunk_bits) - 1)
+        byte, mask = offset >> 3, 1 << (offset & 7)
+
+        with self.lock:
+            chunk = self.chunks.get(chunk_id)
+            if chunk is None:
+                chunk = self.chunks[chunk_id] = bytearray(1 << (self.chunk_bits - 3))
+
+            if chunk[byte] & mask:
+                return False
+
+            chunk[byte] |= mask
+            self.count += 1
+            return True
+
+    def __contains__(self, item: int) -> bool:
+        chunk = self.chunks.get(item >> self.chunk_bits)
+        if chunk is None:
+            return False
+
+        offset = item & ((1 << self.chunk_bits) - 1)
+        return bool(chunk[offset >> 3] & (1 << (offset & 7)))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.chunks) << (self.chunk_bits - 3)
+
+
+class BloomSeenIndex:
+    """
+    Bloom filter over integer ids with memory bounded by `capacity` and `error_rate`.
+    A false positive makes a new id look seen, so about `error_rate` of unique ids
+    are reported as duplicates once `capacity` ids were added.
+    """
+
+    def __init__(self, capacity: int = 2000000, error_rate: float = 0.001):
+        """
+        :param capacity: expected number of unique ids
+        :param error_rate: false positive probability at capacity
+        """
+
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+
+        self.lock = threading.Lock()
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def get_positions(self, item: int):
+        """
+        Bit positions of id (double hashing over a 64-bit mix of the id).
+
+        :param item: integer id
+        :return: generator of bit positions
+        """
+
+        # splitmix64 finalizer
+        value = (item + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        value ^= value >> 31
+
+        first, second = value & 0xFFFFFFFF, (value >> 32) | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: int) -> bool:
+        """
+        Add id to the filter.
+
+        :param item: integer id
+        :return: True if id was (most likely) not seen before
+        """
+
+        is_new = False
+        with self.lock:
+            for position in self.get_positions(item):
+                byte, mask = position >> 3, 1 << (position & 7)
+                if not self.bits[byte] & mask:
+                    self.bits[byte] |= mask
+                    is_new = True
+
+            self.count += is_new
+        return is_new
+
+    def __contains__(self, item: int) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.get_positions(item))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+
+def create_seen_index(mode: str = 'exact', capacity: int = 2000000, error_rate: float = 0.001):
+    """
+    Build a run-scoped seen-id index.
+
+    :param mode: 'exact' (chunked bitmap), 'bloom' (bounded memory, approximate) or 'off'
+    :param capacity: expected number of unique ids (bloom mode)
+    :param error_rate: false positive probability at capacity (bloom mode)
+    :return: index object OR None if disabled
+    """
+
+    if mode == 'off':
+        return None
+
+    if mode == 'bloom':
+        return BloomSeenIndex(capacity=capacity, error_rate=error_rate)
+
+    if mode == 'exact':
+        return BitmapSeenIndex()
+
+    raise ValueError(f'unsupported seen index mode:: {mode}')
@@ -5,7 +5,33 @@ import threading
 from functools import wraps
 from queue import Queue, Empty
 from datetime import datetime
-from time import sleep as wait
+from time import monotonic, sleep
+
+try:
+    from core.task_destribution.retry_queue import RetryQueue, get_backoff_delay
+except ImportError as ie:
+    exit(f'failed to import retry queue module:: {ie}')
+
+try:
+    from core.task_destribution.bounded_queue import BoundedResultsQueue
+except ImportError as ie:
+    exit(f'failed to import bounded queue module:: {ie}')
+
+
+class TaskAck:
+    """
+    Acknowledgement of a shared queue task, sent through results queue behind results of the task,
+    so the task is marked done only after its results are saved.
+    """
+
+    __slots__ = ('task',)
+
+    # not counted against save_result_limit
+    batch_size = 0
+    nbytes = 64
+
+    def __init__(self, task):
+        self.task = task
 
 
 class ThreadingBase:
@@ -13,12 +39,26 @@ class ThreadingBase:
     Base class for multi-threaded scraping and result processing.
     """
 
-    def __init__(self, th_num=10, logger=None):
+    # returned by executors when task was moved to retry queue (not counted as success or failure)
+    retry_marker = 'retry'
+
+    # put into results queue after all consumers finished, stops saving thread
+    results_sentinel = object()
+
+    # consecutive errors of tasks queue (e.g. lost database connection) before consumers are stopped
+    max_queue_errors = 5
+
+    def __init__(self, th_num=10, logger=None, concurrency_controller=None, retry_queue=None, results_max_items=0, results_max_bytes=0, task_queue=None):
         """
         Initialize threading environment.
 
         :param th_num: number of consumer threads (default 10)
         :param logger: logging.Logger instance
+        :param concurrency_controller: optional AIMDController replacing fixed semaphore
+        :param retry_queue: optional RetryQueue for delayed retries of failed tasks
+        :param results_max_items: maximum number of queued results (0 - unlimited)
+        :param results_max_bytes: maximum estimated size of queued results in bytes (0 - unlimited)
+        :param task_queue: optional shared tasks queue (e.g. PostgresTaskQueue) replacing in-process queue
         """
 
         self.logger = logger
@@ -33,20 +73,32 @@ class ThreadingBase:
         self.t_counter = 0
 
         # queue for scraping distribution tasks
-        self.tasks = Queue()
+        # (distributed queue lets several processes share one run)
+        self.tasks = task_queue if task_queue is not None else Queue()
 
         # queue for saving scraping results in parallel
-        self.results = Queue()
+        # (bounded: producers wait when the writer falls behind)
+        self.results = BoundedResultsQueue(maxsize=results_max_items, max_bytes=results_max_bytes)
+
+        # delay queue for failed tasks waiting for backoff
+        self.retry_queue = retry_queue if retry_queue is not None else RetryQueue(logger=logger)
+
+        # lock for counters that are changed by multiple consumers
+        self.counter_lock = threading.Lock()
 
         # identifier that would stop all consumers if critical exception occurs
         self.is_stopped = False
 
         # semaphore object that would manage consumer
-        self.block = threading.Semaphore(th_num)
+        # (adaptive controller changes number of active consumers while running)
+        self.block = concurrency_controller or threading.Semaphore(th_num)
 
         # size of saving batch
         self.save_result_limit = 100
 
+        # maximum age (seconds) of not full saving batch
+        self.save_max_latency = 5
+
         # start time for progress monitoring
         self.start_time = datetime.now()
 
@@ -101,32 +153,204 @@ class ThreadingBase:
                 self.f_counter += 1
             finally:
                 if self.t_counter > 0:
-                    self.logger.info(f'success:: {self.s_counter} / failed:: {self.f_counter} / total:: {self.t_counter} progress:: {round((self.s_counter + self.f_counter) / self.t_counter * 100, 2)}% / exec time:: {str(datetime.now() - self.start_time)}')
+                    self.logger.info(f'success:: {self.s_counter} / failed:: {self.f_counter} / total:: {self.t_counter} progress:: {round((self.s_counter + self.f_counter) / self.t_counter * 100, 2)}% / exec time:: {str(datetime.now() - self.start_time)}{self.get_window_info()}')
 
         return wrapper
 
+    def get_window_info(self):
+        """
+        Current concurrency window for progress logs.
+
+        :return: formatted string or empty string for fixed semaphore
+        """
+
+        if hasattr(self.block, 'window'):
+            return f' / window:: {self.block.window}'
+        return ''
+
+    def report_response(self, status_code=None, latency=None):
+        """
+        Feed response outcome to adaptive concurrency controller (if any).
+
+        :param status_code: response status code (None for network errors and timeouts)
+        :param latency: request duration in seconds
+        """
+
+        if hasattr(self.block, 'record'):
+            self.block.record(status_code, latency)
+
+    def has_pending_tasks(self):
+        """
+        Check whether any task is queued, processed or waiting for retry.
+        Retry queue is checked first: released retries are put into tasks queue under its lock.
+
+        :return: True if pipeline has unfinished work
+        """
+        return len(self.retry_queue) != 0 or self.tasks.unfinished_tasks != 0
+
+    def schedule_retry(self, task, max_attempts):
+        """
+        Move a failed task to retry queue instead of sleeping inside worker.
+
+        :param task: failed task
+        :param max_attempts: maximum number of attempts for a task
+        :return: retry_marker if retry scheduled, False if attempts or retry budget are exhausted
+        """
+        attempt = task.get('attempt', 0) + 1
+        if attempt >= max_attempts:
+            return False
+
+        if not self.retry_queue.schedule({**task, 'attempt': attempt}, attempt):
+            self.logger.warning(f'retry budget exhausted:: {self.retry_queue.get_stats()}')
+            return False
+
+        return self.retry_marker
+
+    def put_tasks(self, tasks):
+        """
+        Put tasks into the queue, with a single statement if queue supports it.
+
+        :param tasks: list of tasks
+        """
+        if hasattr(self.tasks, 'put_many'):
+            self.tasks.put_many(tasks)
+        else:
+            [self.tasks.put(task) for task in tasks]
+
+    def complete_task(self, task, result=None):
+        """
+        Mark a taken task as processed.
+        Distributed queue task is acknowledged by saving thread after results of the task are saved;
+        until then it stays claimed, so results lost in a crashed process are scraped again by other workers.
+        Task whose executor raised (exception returned by the exception decorators) is not acknowledged.
+
+        :param task: processed task
+        :param result: result of executor
+        """
+        if isinstance(self.tasks, Queue):
+            self.tasks.task_done()
+        elif result is self.retry_marker:
+            # retry already returned task to the shared queue
+            return
+        elif isinstance(result, Exception):
+            # claim expires and the task is scraped again
+            self.tasks.release([task])
+        else:
+            self.results.put(TaskAck(task))
+
+    def acknowledge_tasks(self, acks, is_saved):
+        """
+        Acknowledge distributed queue tasks whose results were saved (or release them after failed saving).
+
+        :param acks: list of TaskAck objects
+        :param is_saved: True if results of the batch were saved
+        """
+        if not acks:
+            return
+
+        tasks = [ack.task for ack in acks]
+        if not is_saved:
+            self.tasks.release(tasks)
+            return
+
+        try:
+            self.tasks.task_done_many(tasks)
+        except Exception as e:
+            # claims expire and tasks are scraped again, saving is idempotent
+            self.logger.error(f'failed to acknowledge tasks:: {len(tasks)} :: {e}')
+            self.tasks.release(tasks)
+
+    def save_batch(self, method, to_save):
+        """
+        Save a batch of results and acknowledge distributed queue tasks of the batch.
+
+        :param method: saving executor
+        :param to_save: list of results (and task acknowledgements)
+        :return: False if saving failed
+        """
+        acks = [res for res in to_save if isinstance(res, TaskAck)]
+        results = [res for res in to_save if not isinstance(res, TaskAck)] if acks else to_save
+
+        # only True is success: exception decorator returns the raised exception, cursor decorator may return None
+        is_saved = not results or method(results) is True
+        self.acknowledge_tasks(acks, is_saved)
+
+        return is_saved
+
     def scraping_consumer(self, method):
         """
         Single thread worker
         :param method:
         :return:
         """
-        while self.tasks.qsize() != 0 and not self.is_stopped:
+        queue_errors = 0
+        while not self.is_stopped:
+            try:
+                self.retry_queue.release_ready(self.tasks.put)
+
+                try:
+                    task = self.tasks.get(timeout=0.1)
+                except Empty:
+                    # other consumers may still produce follow-up tasks or retries
+                    if not self.has_pending_tasks():
+                        self.logger.info(f'task queue is empty')
+                        break
+                    queue_errors = 0
+                    continue
+            except Exception as e:
+                queue_errors += 1
+                delay = self.get_queue_error_delay(e, queue_errors)
+                if delay is None:
+                    break
+                sleep(delay)
+                continue
+
+            queue_errors = 0
+
+            result = None
             try:
                 self.block.acquire()
-                task = self.tasks.get(timeout=0.1)
-                method(task)
-            except Empty:
-                self.logger.info(f'task queue is empty')
-                break
+                result = method(task)
             except Exception as e:
                 self.logger.error(f'consumer exception occurred:: {e}')
                 break
             finally:
                 self.block.release()
+                self.complete_task(task, result)
 
         self.logger.info(f'consumer finished procession')
 
+    def get_queue_error_delay(self, e, queue_errors):
+        """
+        Handle error of shared tasks queue (database unavailable, lost connection):
+        consumer waits and retries, after max_queue_errors consecutive errors all consumers are stopped.
+        Claimed tasks of a stopped run are returned to the queue by its visibility timeout.
+
+        :param e: exception
+        :param queue_errors: number of consecutive errors of the consumer
+        :return: delay in seconds before next attempt OR None if consumer should stop
+        """
+        if queue_errors >= self.max_queue_errors:
+            self.logger.error(f'tasks queue is unavailable, stopping consumers:: {e}')
+            self.is_stopped = True
+            return None
+
+        delay = get_backoff_delay(queue_errors - 1, base_delay=1, max_delay=10)
+        self.logger.warning(f'tasks queue error {queue_errors}/{self.max_queue_errors}:: {e} :: retrying in {delay:.1f} s')
+        return delay
+
+    def add_tasks(self, tasks):
+        """
+        Put follow-up tasks into the queue while pipeline is running.
+
+        :param tasks: list of tasks
+        :return:
+        """
+        with self.counter_lock:
+            self.t_counter += len(tasks)
+
+        self.put_tasks(tasks)
+
     def save_results(self, method, force_save=False):
         """
         Method performs batch saving in a separate thread
@@ -135,38 +359,44 @@ class ThreadingBase:
         :return:
         """
         to_save = list()
+        # number of items in the batch; a queued result may be a batch of items itself (`batch_size`)
+        to_save_count = 0
 
         if not force_save:
+            # batch is flushed when it reaches save_result_limit items or becomes
+            # save_max_latency seconds old; get() wakes up on put, no polling
+            batch_started_at = None
             while True:
-                self.logger.info(f'results queue size:: {self.results.qsize()}')
-                # check current result queue size
-                if self.results.qsize() >= self.save_result_limit:
-                    self.logger.info(f'start saving results')
-                    for _ in range(self.save_result_limit):
-                        if self.results.qsize() != 0:
-                            res = self.results.get()
-                            to_save.append(res)
-
+                timeout = None
                 if to_save:
-                    if method(to_save) is False:
+                    timeout = max(self.save_max_latency - (monotonic() - batch_started_at), 0)
+
+                try:
+                    res = self.results.get(timeout=timeout)
+                except Empty:
+                    res = None
+
+                is_last = res is self.results_sentinel
+                if res is not None and not is_last:
+                    if not to_save:
+                        batch_started_at = monotonic()
+                    to_save.append(res)
+                    to_save_count += getattr(res, 'batch_size', 1)
+
+                if to_save and (is_last or res is None or to_save_count >= self.save_result_limit):
+                    self.logger.info(f'start saving results:: {to_save_count} / queue:: {self.results.get_metrics()}')
+                    if self.save_batch(method, to_save) is False:
                         self.logger.error(f'saving finished with errors')
                         self.is_stopped = True
                     else:
                         self.logger.info(f'saving completed')
 
                     to_save.clear()
+                    to_save_count = 0
 
-                if self.tasks.qsize() == 0 and self.results.qsize() == 0:
+                if is_last:
                     self.logger.info(f'breaking saving loop')
                     break
-
-                elif self.tasks.qsize() == 0 and self.results.qsize() != 0:
-                    self.logger.info(f'tasks queue is empty:: processing last results')
-                    for _ in range(self.save_result_limit):
-                        if self.results.qsize() != 0:
-                            res = self.results.get()
-                            to_save.append(res)
-                wait(1)
         else:
             # force_save=True
             # save all existed data inside self.results queue
@@ -178,7 +408,7 @@ class ThreadingBase:
                     r = self.results.get()
                     to_save.append(r)
 
-                if method(to_save) is False:
+                if self.save_batch(method, to_save) is False:
                     self.logger.error(f'saving finished with errors')
                 else:
                     self.logger.info(f'saving completed')
@@ -210,7 +440,7 @@ class ThreadingBase:
         self.is_stopped = False
 
         # create new tasks queue
-        [self.tasks.put(data) for data in input_data]
+        self.put_tasks(input_data)
 
         del input_data
         self.logger.info('properties ids tasks prepared')
@@ -219,27 +449,23 @@ class ThreadingBase:
         pool = [threading.Thread(target=self.scraping_consumer, kwargs={"method": self.scraping_executor}) for _ in range(self.th_num)]
 
         # initialize additional consumer thread for saving results
-        pool.append(threading.Thread(target=self.save_results, kwargs={'method': self.saving_executor, 'force_save': False}))
+        saver = threading.Thread(target=self.save_results, kwargs={'method': self.saving_executor, 'force_save': False})
 
         self.logger.info('threads prepared')
 
         # launching threads
+        saver.start()
         for th in pool:
             th.start()
 
-        # waiting till threads are finished
+        # waiting till consumers are finished
         for th in pool:
             th.join()
 
-        if not self.results.empty():
-            self.logger.info("Result queue is not empty... Starting last saving")
-
-            to_save = []
-            while not self.results.empty():
-                to_save.append(self.results.get())
-
-            self.saving_executor(to_save)
-            self.logger.info("Save result is ended")
+        # all producers are done: saver flushes the rest and exits on sentinel
+        self.results.put(self.results_sentinel)
+        saver.join()
+        self.logger.info(f'results queue metrics:: {self.results.get_metrics()}')
 
         if self.tasks.qsize() != 0 and self.is_stopped is True:
             self.logger.error(f'execution pipeline finished with errors')
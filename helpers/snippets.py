@@ -1,3 +1,4 @@
+import os
 import json
 from uuid import uuid4
 
@@ -29,6 +30,31 @@ def write_json_config(data, path):
     except Exception as e:
         return e
 
+def write_json_iterable(data, path):
+    """
+    write json array item by item, so data could be a generator
+    :param data: iterable of json serializable items
+    :param path:
+    :return: number of written items OR exception
+    """
+    # previous file is replaced only when the whole array is written
+    tmp_path = f'{path}.tmp'
+    try:
+        count = 0
+        with open(tmp_path, 'w') as f:
+            f.write('[')
+            for item in data:
+                f.write(',\n' if count else '\n')
+                f.write(json.dumps(item))
+                count += 1
+            f.write('\n]\n')
+        os.replace(tmp_path, path)
+        return count
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return e
+
 def get_unique_identifier():
     """
     get unique identifier
@@ -1,4 +1,6 @@
+import os
 import sys
+import argparse
 from datetime import datetime
 from pathlib import Path
 
@@ -9,6 +11,51 @@ try:
 except ImportError as ie:
     exit(f"Cannot import BaseMain class:: {ie}")
 
+try:
+    from core.network.session_pool import SessionPool
+except ImportError as ie:
+    exit(f"Cannot import SessionPool:: {ie}")
+
+try:
+    from core.network.rate_limiter import ProxyRateLimiter
+except ImportError as ie:
+    exit(f"Cannot import ProxyRateLimiter:: {ie}")
+
+try:
+    from core.network.proxy_manager import ProxyManager
+except ImportError as ie:
+    exit(f"Cannot import ProxyManager:: {ie}")
+
+try:
+    from core.task_destribution.concurrency_controller import AIMDController
+except ImportError as ie:
+    exit(f"Cannot import AIMDController:: {ie}")
+
+try:
+    from core.task_destribution.retry_queue import RetryQueue
+except ImportError as ie:
+    exit(f"Cannot import RetryQueue:: {ie}")
+
+try:
+    from core.task_destribution.pg_task_queue import PostgresTaskQueue
+except ImportError as ie:
+    exit(f"Cannot import PostgresTaskQueue:: {ie}")
+
+try:
+    from core.task_destribution.seen_index import create_seen_index
+except ImportError as ie:
+    exit(f"Cannot import seen index:: {ie}")
+
+try:
+    from core.task_destribution.category_scheduler import IncrementalScheduler
+except ImportError as ie:
+    exit(f"Cannot import IncrementalScheduler:: {ie}")
+
+try:
+    from core.network.json_decoder import create_json_decoder
+except ImportError as ie:
+    exit(f"Cannot import json decoder:: {ie}")
+
 try:
     from services.category_scraper import CategoryScraper
 except ImportError as ie:
@@ -20,10 +67,25 @@ except ImportError as ie:
     exit(f"Cannot import ProductScraper:: {ie}")
 
 try:
-    from helpers.snippets import write_json_config
+    from services.async_products_scraper import AsyncProductsScraper
+except ImportError as ie:
+    AsyncProductsScraper = None
+
+try:
+    from helpers.snippets import write_json_iterable
 except ImportError as ie:
     exit(f"Cannot import snippets:: {ie}")
 
+try:
+    from core.export.jsonl_writer import export_jsonl
+except ImportError as ie:
+    exit(f"Cannot import JSONL exporter:: {ie}")
+
+try:
+    from core.export.parquet_writer import export_parquet
+except ImportError as ie:
+    exit(f"Cannot import Parquet exporter:: {ie}")
+
 class MainManager(BaseMain):
     """
     Manager class for orchestrating BigBasket scraping pipeline.
@@ -32,14 +94,22 @@ class MainManager(BaseMain):
 
     service_name = 'bigbasket_scraping_manager'
 
-    def __init__(self):
+    def __init__(self, resume_run_id: str = None, run_id: str = None):
         """
         Initialize scraping manager with base configuration,
         category scraper, and product scraper.
+
+        :param resume_run_id: identifier of a crashed run to continue (pages completed by it are skipped)
+        :param run_id: identifier of a shared run to join (postgres tasks queue)
         """
 
         super().__init__()
 
+        # run identifier keys page checkpoints and shared tasks, resumed run keeps its original id
+        if resume_run_id or run_id:
+            self.task_id = resume_run_id or run_id
+        self.is_resumed = bool(resume_run_id)
+
         self.base_url = 'https://www.bigbasket.com/'
         self.base_headers = {
             'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -49,29 +119,160 @@ class MainManager(BaseMain):
             'upgrade-insecure-requests': '1',
         }
 
-        proxy_pool = self.proxies_config.get(self.service_name).get('pool', [])
+        # manager specific settings (engine selection, concurrency)
+        self.manager_config = self.config.get(self.service_name, {})
+        self.engine = self.manager_config.get('engine', 'threads')
+
+        proxy_pool = self.proxies_settings.get('pool', [])
+
+        # per-proxy token bucket and in-flight cap shared by both scrapers
+        self.rate_limiter = ProxyRateLimiter(
+            rate=self.proxies_settings.get('requests_per_second'),
+            burst=self.proxies_settings.get('burst'),
+            max_in_flight=self.proxies_settings.get('conn_per_ip'),
+            logger=self.logger
+        )
+
+        # health scored proxy selection with circuit breaking
+        self.proxy_manager = ProxyManager(
+            base_proxy=proxy_pool,
+            logger=self.logger,
+            failure_threshold=self.proxies_settings.get('failure_threshold', 5),
+            cooldown=self.proxies_settings.get('cooldown', 60)
+        )
+
+        # warmed sessions shared by both scrapers
+        self.session_pool = SessionPool(
+            base_url=self.base_url,
+            base_headers=self.base_headers,
+            base_user_agents=self.agents_list,
+            base_proxy=proxy_pool,
+            logger=self.logger,
+            timeout=self.proxies_settings.get('timeout', 15),
+            rate_limiter=self.rate_limiter,
+            proxy_manager=self.proxy_manager,
+            **self.manager_config.get('session_pool', {})
+        )
+
+        # shared by all scrapers: orjson / msgspec when installed, stdlib json otherwise
+        self.json_decoder = create_json_decoder(self.manager_config.get('json_backend', 'auto'), logger=self.logger)
 
         self.category_scraper = CategoryScraper(
             base_url=self.base_url,
             base_headers=self.base_headers,
             base_user_agents=self.agents_list,
             base_proxy= proxy_pool,
-            logger=self.logger
+            logger=self.logger,
+            session_pool=self.session_pool,
+            json_decoder=self.json_decoder
         )
 
-        self.product_scraper = ProductsScraper(
+        # number of workers is the upper bound, adaptive controller decides how many are active
+        workers_num = self.manager_config.get('async_concurrency', 300) if self.engine == 'asyncio' else self.manager_config.get('th_num', 20)
+        concurrency_config = self.manager_config.get('concurrency')
+        self.concurrency_controller = AIMDController(
+            logger=self.logger,
+            # configured max_window overrides the number of workers
+            **{'max_window': workers_num, **concurrency_config}
+        ) if concurrency_config else None
+
+        # append-only price snapshots (partitioned by scrape date)
+        self.price_history_config = self.manager_config.get('price_history', {})
+
+        # delayed retries with backoff and global retry budget
+        self.retry_queue = RetryQueue(logger=self.logger, **self.manager_config.get('retry', {}))
+
+        # postgres backed tasks queue lets several processes/hosts share one run,
+        # delayed retries are kept in the same table
+        task_queue_config = dict(self.manager_config.get('task_queue', {}))
+        self.task_queue = None
+        if task_queue_config.pop('backend', 'memory') == 'postgres':
+            self.task_queue = PostgresTaskQueue(
+                db=self.db,
+                run_id=self.task_id,
+                logger=self.logger,
+                # task_queue section overrides retry settings
+                **{**self.manager_config.get('retry', {}), **task_queue_config}
+            )
+            self.retry_queue = self.task_queue
+
+        # parameters shared by thread and asyncio engines
+        scraper_kwargs = dict(
             base_url=self.base_url,
             base_headers=self.base_headers,
             base_user_agents=self.agents_list,
             base_proxy=proxy_pool,
             logger=self.logger,
-            th_num=20,
+            th_num=workers_num,
             db=self.db,
-            save_result_limit=250
+            save_result_limit=self.manager_config.get('save_result_limit', 250),
+            session_pool=self.session_pool,
+            concurrency_controller=self.concurrency_controller,
+            retry_queue=self.retry_queue,
+            save_max_latency=self.manager_config.get('save_max_latency', 5),
+            results_max_items=self.manager_config.get('results_queue', {}).get('max_items', 0),
+            results_max_bytes=self.manager_config.get('results_queue', {}).get('max_bytes', 0),
+            bulk_save=self.manager_config.get('bulk_save', False),
+            price_history_partition=self.price_history_config.get('partition', 'day') if self.price_history_config.get('enabled') else None,
+            run_id=self.task_id,
+            resume=self.is_resumed,
+            task_queue=self.task_queue,
+            longest_first=self.manager_config.get('longest_first', False),
+            seen_index=create_seen_index(**self.manager_config.get('seen_index', {})),
+            columnar_batch=self.manager_config.get('columnar_batch', False),
+            json_decoder=self.json_decoder,
+            listing_schema=self.manager_config.get('listing_schema', False)
         )
 
+        if self.engine == 'asyncio':
+            if AsyncProductsScraper is None:
+                self.logger.critical(f"asyncio engine selected, but aiohttp based scraper is not available")
+                exit()
+
+            self.product_scraper = AsyncProductsScraper(
+                conn_per_ip=self.proxies_settings.get('conn_per_ip', 20),
+                request_timeout=self.proxies_settings.get('timeout', 15),
+                rate_limiter=self.rate_limiter,
+                **scraper_kwargs
+            )
+        else:
+            self.product_scraper = ProductsScraper(**scraper_kwargs)
+
         self.start_time = datetime.now()
 
+    def export_results(self):
+        """
+        Export scraped products into a file selected by `export` settings:
+        - jsonl: JSON Lines (optionally gzip/zstd compressed), written atomically
+        - json: legacy JSON array
+        - parquet: columnar Parquet written in row groups (requires pyarrow)
+
+        :return: number of exported products OR exception
+        """
+
+        export_config = self.manager_config.get('export', {})
+        export_format = export_config.get('format', 'jsonl')
+        default_path = {'json': 'output_data.json', 'parquet': 'output/products.parquet'}.get(export_format, 'output/products.jsonl')
+        path = os.path.join(self.project_dir, export_config.get('path', default_path))
+
+        if export_format == 'json':
+            return write_json_iterable(self.db.iter_results(), path)
+
+        if export_format == 'jsonl':
+            return export_jsonl(self.db.iter_results(), path, compression=export_config.get('compression'), logger=self.logger)
+
+        if export_format == 'parquet':
+            row_group_size = export_config.get('row_group_size', 50000)
+            return export_parquet(
+                self.db.iter_results(batch_size=min(row_group_size, 10000), query=self.db.typed_results_query),
+                path,
+                row_group_size=row_group_size,
+                compression=export_config.get('compression') or 'zstd',
+                logger=self.logger
+            )
+
+        return ValueError(f"unsupported export format:: {export_format}")
+
     def run(self):
         """
         Run the full scraping pipeline:
@@ -83,28 +284,63 @@ class MainManager(BaseMain):
         :return: True on success, False on failure
         """
 
-        self.logger.info("Starting pipeline")
+        self.logger.info(f"Starting pipeline:: run id:: {self.task_id}{' (resumed)' if self.is_resumed else ''}")
 
         categories_to_scrape = self.category_scraper.get_categories()
         if not categories_to_scrape:
             self.logger.error(f"Cannot get categories... Exiting...")
             return False
 
-        self.logger.info(f"Found {len(categories_to_scrape)} categories. Starting product scraper")
+        self.logger.info(f"Found {len(categories_to_scrape)} categories")
+
+        # incremental mode: revisit categories by expected change per request within request budget
+        incremental_config = self.manager_config.get('incremental', {})
+        if incremental_config.get('enabled') and not self.is_resumed:
+            category_stats = self.db.get_category_stats()
+            if category_stats is False:
+                self.logger.error(f"Cannot get category statistics... Running full crawl")
+            else:
+                scheduler = IncrementalScheduler(
+                    request_budget=incremental_config.get('request_budget', 5000),
+                    default_change_rate=incremental_config.get('default_change_rate', 0.05),
+                    min_change_rate=incremental_config.get('min_change_rate', 0.001),
+                    logger=self.logger
+                )
+                categories_to_scrape = scheduler.select(categories_to_scrape, category_stats)
+
+        self.logger.info(f"Starting product scraper for {len(categories_to_scrape)} categories")
 
         self.product_scraper.run(categories_to_scrape)
+        self.session_pool.close()
+        if self.task_queue:
+            self.task_queue.close()
+
+        self.logger.info(f"Retry stats:: {self.retry_queue.get_stats()}")
+        for stats in self.proxy_manager.get_stats():
+            self.logger.info(f"Proxy health:: {stats}")
 
-        result = self.db.get_results()
-        self.logger.info(f"Scrapped {len(result)} items")
+        # retention of price history is done by dropping whole partitions
+        retention = self.price_history_config.get('retention')
+        if self.price_history_config.get('enabled') and retention:
+            self.db.drop_partitions('bigbasket.price_history', keep=retention, partition=self.price_history_config.get('partition', 'day'))
 
-        is_saved = write_json_config(result, "output_data.json")
-        if is_saved is not True:
+        # products are streamed from a server-side cursor straight into the file
+        is_saved = self.export_results()
+        if isinstance(is_saved, Exception):
             self.logger.error(f"Unexpected error on saving results {is_saved}")
             return False
 
+        self.logger.info(f"Scrapped {is_saved} items")
+
+        self.db.close()
         self.logger.info(f"Pipeline execution completed. Time of execution:: {datetime.now() - self.start_time}")
 
 
 if __name__ == '__main__':
-    ex = MainManager()
+    parser = argparse.ArgumentParser(description='BigBasket scraping pipeline')
+    parser.add_argument('--resume', metavar='RUN_ID', default=None, help='continue a crashed run, skipping completed pages')
+    parser.add_argument('--run-id', metavar='RUN_ID', default=None, help='join a shared run (postgres tasks queue) with the same id on several hosts')
+    args = parser.parse_args()
+
+    ex = MainManager(resume_run_id=args.resume, run_id=args.run_id)
     ex.run()
@@ -0,0 +1,383 @@
+import sys
+import asyncio
+import random
+import threading
+from functools import wraps
+from pathlib import Path
+from queue import Queue, Empty
+from datetime import datetime
+from time import monotonic
+
+import aiohttp
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    from services.products_scraper import ProductsScraper
+except ImportError as ie:
+    exit(f"Cannot import ProductsScraper:: {ie}")
+
+try:
+    from core.network.rate_limiter import ProxyRateLimiter
+except ImportError as ie:
+    exit(f"Cannot import ProxyRateLimiter:: {ie}")
+
+
+class AsyncProductsScraper(ProductsScraper):
+    """
+    Asyncio based variant of ProductsScraper.
+    Keeps the same parsing and saving logic, but drives page fetches
+    with aiohttp coroutines instead of OS threads. Concurrency is capped
+    per proxy by the shared ProxyRateLimiter (`conn_per_ip` in-flight requests).
+    """
+
+    def __init__(self, conn_per_ip: int = 20, request_timeout: int = 15, rate_limiter: ProxyRateLimiter = None, **kwargs):
+        """
+        Initialize async products scraper with base configuration.
+
+        :param conn_per_ip: Maximum number of in-flight requests per proxy
+        :param request_timeout: Total timeout of a single request in seconds
+        :param rate_limiter: Shared per-proxy rate limiter (in-flight cap only if not provided)
+        :param kwargs: ProductsScraper parameters (th_num is the number of consumer coroutines,
+            session_pool is used for proxies and headers)
+        """
+
+        super().__init__(**kwargs)
+
+        self.conn_per_ip = conn_per_ip
+        self.request_timeout = request_timeout
+
+        self.rate_limiter = rate_limiter or ProxyRateLimiter(max_in_flight=conn_per_ip, logger=self.logger)
+
+        # proxy -> warmed aiohttp session
+        self.sessions = {}
+
+    def async_exception(method):
+        """
+        Async counterpart of ThreadingBase.exception decorator.
+
+        :param method: wrapped coroutine function
+        :return: wrapper
+        """
+
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await method(self, *args, **kwargs)
+            except Exception as e:
+                self.logger.exception(f'exception in "{method.__name__}" => {e}')
+                return e
+
+        return wrapper
+
+    def async_progress_logger(method):
+        """
+        Async counterpart of ThreadingBase.progress_logger decorator.
+
+        :param method: wrapped coroutine function
+        :return: wrapper
+        """
+
+        async def wrapper(self, *args, **kwargs):
+            try:
+                result = await method(self, *args, **kwargs)
+                if result is False:
+                    self.f_counter += 1
+                elif result is None:
+                    self.f_counter += 1
+                elif result is True:
+                    self.s_counter += 1
+                return result
+            except Exception as e:
+                self.logger.exception(f'exception occurred during progress logging:: {e}')
+                self.f_counter += 1
+            finally:
+                if self.t_counter > 0:
+                    self.logger.info(f'success:: {self.s_counter} / failed:: {self.f_counter} / total:: {self.t_counter} progress:: {round((self.s_counter + self.f_counter) / self.t_counter * 100, 2)}% / exec time:: {str(datetime.now() - self.start_time)}{self.get_window_info()}')
+
+        return wrapper
+
+    async def initialize_async_session(self, proxy: str):
+        """
+        Create and warm up an aiohttp session bound to a single proxy.
+
+        :param proxy: Proxy string
+        :return: aiohttp.ClientSession object on success, False on failure
+        """
+
+        for attempt in range(self.max_retries):
+            session = aiohttp.ClientSession(
+                headers=self.session_pool.get_random_headers(),
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                connector=aiohttp.TCPConnector(limit=self.conn_per_ip)
+            )
+            try:
+                self.logger.info(f"Start creating async session:: {proxy}... Attempt:: {attempt}")
+
+                async with session.get(self.base_url, proxy=proxy) as response:
+                    if response.status != 200:
+                        raise Exception(f"Not available status code {response.status}")
+
+                return session
+
+            except Exception as e:
+                self.logger.error(f"Unexpected error on creating async session {proxy}:: {e}")
+                await session.close()
+                continue
+        else:
+            self.logger.error(f"Max retries expected for proxy:: {proxy}")
+            return False
+
+    async def initialize_async_sessions(self):
+        """
+        Warm up one session per proxy concurrently.
+
+        :return: True if at least one session is available, False otherwise
+        """
+
+        proxies = list(dict.fromkeys(self.base_proxy))
+        sessions = await asyncio.gather(*[self.initialize_async_session(proxy) for proxy in proxies])
+
+        for proxy, session in zip(proxies, sessions):
+            if session:
+                self.sessions[proxy] = session
+
+        self.logger.info(f"Async sessions prepared:: {len(self.sessions)}/{len(proxies)}")
+        return bool(self.sessions)
+
+    async def close_async_sessions(self):
+        """
+        Close all opened aiohttp sessions.
+        """
+
+        for session in self.sessions.values():
+            await session.close()
+
+        self.sessions.clear()
+
+    def get_random_proxy(self):
+        """
+        Select a proxy among those with a warmed session (health weighted if proxy manager is set).
+
+        :return: Proxy string
+        """
+
+        if self.sessions:
+            if self.session_pool.proxy_manager:
+                return self.session_pool.proxy_manager.select(candidates=list(self.sessions))
+            return random.choice(list(self.sessions))
+
+        return self.session_pool.get_random_proxy()
+
+    async def fetch_page(self, params: dict):
+        """
+        Fetch a single listing page through a randomly selected proxy.
+
+        :param params: Query parameters of listing request
+        :return: Tuple of (status code, decoded JSON or None)
+        """
+
+        proxy = self.get_random_proxy()
+
+        # wait only on the picked proxy
+        await self.rate_limiter.acquire_async(proxy)
+
+        status_code = None
+        started_at = monotonic()
+        try:
+            async with self.sessions[proxy].get(self.api_base_url, params=params, proxy=proxy) as response:
+                status_code = response.status
+                if response.status != 200:
+                    return response.status, None
+
+                return response.status, self.listing_decoder.decode(await response.read())
+        finally:
+            latency = monotonic() - started_at
+            self.rate_limiter.release(proxy)
+            self.report_response(status_code, latency)
+            if self.session_pool.proxy_manager:
+                self.session_pool.proxy_manager.record(proxy, status_code, latency)
+
+    @async_progress_logger
+    @async_exception
+    async def scraping_executor(self, task: dict):
+        """
+        Execute product scraping for a single page of a category.
+        The first page fans out the remaining pages as separate tasks,
+        failed attempt is moved to retry queue with backoff.
+
+        :param task: Dictionary containing category info (type, slug, id, name), optional page and attempt
+        :return: True on successful processing, retry_marker if retry is scheduled, False if all retries failed
+        """
+
+        type_ = task.get("type")
+        slug = task.get("slug")
+        category_name = task.get("category_name")
+        category_id = task.get('id')
+        page = task.get('page', 1)
+
+        self.logger.info(f"Starting processing:: {category_id}::{category_name}::{page}")
+
+        params = {
+            'type': type_,
+            'slug': slug,
+            'page': f"{page}",
+        }
+
+        attempt = task.get('attempt', 0)
+        if attempt == 0:
+            self.retry_queue.record_attempt()
+
+        try:
+            status_code, data = await self.fetch_page(params)
+            if status_code == 204:
+                self.logger.info(f"No content for {category_id}::{category_name}::{page}")
+                await asyncio.get_running_loop().run_in_executor(None, self.mark_page_completed, task)
+                return True
+
+            if status_code != 200:
+                raise Exception(f"Not allowed status code:: {status_code}")
+
+            # parsing runs in executor: results put may block on full queue (backpressure) without stalling event loop
+            last_page = await asyncio.get_running_loop().run_in_executor(None, self.parse_product_data, data, category_id)
+            del data
+
+            if not isinstance(last_page, int):
+                raise Exception(f"Cannot parse count of pages")
+
+            self.logger.info(f"Successfully parsed {page}/{last_page} for category {category_id}::{category_name}")
+
+            if page == 1:
+                self.category_pages[category_id] = last_page
+                if last_page > 1:
+                    await self.call_tasks_queue(self.add_tasks, self.get_page_tasks(task, last_page))
+
+            await asyncio.get_running_loop().run_in_executor(None, self.mark_page_completed, task, last_page)
+            return True
+        except Exception as e:
+            self.logger.error(f"Attempt:: {attempt}:: Unexpected error on {category_id}::{category_name}::{page}:  {e}")
+
+        # failed page waits in retry queue, coroutine moves on to other ready tasks
+        result = await self.call_tasks_queue(self.schedule_retry, task, self.max_retries)
+        if result is False:
+            self.logger.error(f"Max retries occupied for {category_id}::{category_name}::{page}")
+        return result
+
+    async def call_tasks_queue(self, method, *args):
+        """
+        Call a method touching tasks or retry queue. Shared (database) queue calls
+        run in executor, so blocking queries do not stall in-flight requests.
+
+        :param method: callable
+        :param args: positional arguments
+        :return: result of method
+        """
+
+        if isinstance(self.tasks, Queue):
+            return method(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+    async def async_consumer(self, method):
+        """
+        Single coroutine worker for processing product tasks.
+
+        :param method: Coroutine function to process each task
+        """
+
+        queue_errors = 0
+        while not self.is_stopped:
+            try:
+                await self.call_tasks_queue(self.retry_queue.release_ready, self.tasks.put)
+
+                try:
+                    task = await self.call_tasks_queue(self.tasks.get_nowait)
+                except Empty:
+                    # pages of categories in progress or retries may still be added
+                    if not await self.call_tasks_queue(self.has_pending_tasks):
+                        break
+                    queue_errors = 0
+                    # shared queue backs off while nothing is visible
+                    await asyncio.sleep(self.tasks.get_idle_delay() if hasattr(self.tasks, 'get_idle_delay') else 0.1)
+                    continue
+            except Exception as e:
+                queue_errors += 1
+                delay = self.get_queue_error_delay(e, queue_errors)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+                continue
+
+            queue_errors = 0
+
+            # adaptive controller limits number of active coroutines
+            is_adaptive = hasattr(self.block, 'acquire_async')
+            if is_adaptive:
+                await self.block.acquire_async()
+            result = None
+            try:
+                result = await method(task)
+            finally:
+                if is_adaptive:
+                    self.block.release()
+                await self.call_tasks_queue(self.complete_task, task, result)
+
+        self.logger.info(f'async consumer finished procession')
+
+    async def async_pipeline(self):
+        """
+        Warm sessions up and run consumer coroutines until tasks queue is drained.
+
+        :return: True on success, False if no session could be created
+        """
+
+        if not await self.initialize_async_sessions():
+            self.logger.error("Cannot create any async session... Exiting")
+            self.is_stopped = True
+            return False
+
+        try:
+            await asyncio.gather(*[self.async_consumer(self.scraping_executor) for _ in range(self.th_num)])
+        finally:
+            await self.close_async_sessions()
+
+        return True
+
+    @ProductsScraper.exception
+    def execution_pipeline(self, input_data):
+        """
+        Main async execution pipeline.
+        Result saving stays in a separate thread, so blocking DB calls never stall the event loop.
+
+        :param input_data: list of tasks
+        :return: True on success, False on failure
+        """
+
+        # reassign counters
+        self.t_counter = len(input_data)
+        self.s_counter = 0
+        self.f_counter = 0
+        self.is_stopped = False
+
+        # create new tasks queue
+        self.put_tasks(input_data)
+
+        del input_data
+        self.logger.info('category tasks prepared')
+
+        saver = threading.Thread(target=self.save_results, kwargs={'method': self.saving_executor, 'force_save': False})
+        saver.start()
+
+        is_completed = asyncio.run(self.async_pipeline())
+
+        # all producers are done: saver flushes the rest and exits on sentinel
+        self.results.put(self.results_sentinel)
+        saver.join()
+        self.logger.info(f'results queue metrics:: {self.results.get_metrics()}')
+
+        if not is_completed or (self.tasks.qsize() != 0 and self.is_stopped is True):
+            self.logger.error(f'execution pipeline finished with errors')
+            return False
+
+        self.logger.info('pipeline procession completed')
+        return True
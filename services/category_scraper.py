@@ -1,16 +1,32 @@
-import random
+import sys
+from pathlib import Path
 from time import sleep
 
-import requests
+sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    from core.network.session_pool import SessionPool
+except ImportError as ie:
+    exit(f"Cannot import SessionPool:: {ie}")
+
+try:
+    from core.task_destribution.retry_queue import get_backoff_delay
+except ImportError as ie:
+    exit(f"Cannot import get_backoff_delay:: {ie}")
+
+try:
+    from core.network.json_decoder import JsonDecoder
+except ImportError as ie:
+    exit(f"Cannot import JsonDecoder:: {ie}")
 
 class CategoryScraper:
     """
     Scraper class for extracting categories from BigBasket.
-    Handles session creation with proxies and user agents,
+    Uses shared session pool with proxies and user agents,
     category tree parsing, and category data retrieval.
     """
 
-    def __init__(self,base_url:str, base_headers:dict, base_proxy:list, base_user_agents:list, logger):
+    def __init__(self,base_url:str, base_headers:dict, base_proxy:list, base_user_agents:list, logger, session_pool: SessionPool = None, json_decoder: JsonDecoder = None):
         """
         Initialize category scraper with base configuration.
 
@@ -19,6 +35,8 @@ class CategoryScraper:
         :param base_proxy: List of proxies for requests
         :param base_user_agents: List of user-agent headers
         :param logger: Logger instance for tracking execution
+        :param session_pool: Shared pool of warmed sessions (a private one is created if not provided)
+        :param json_decoder: Decoder of response bodies (fastest installed backend if not provided)
         """
 
         self.logger = logger
@@ -29,62 +47,15 @@ class CategoryScraper:
         self.base_user_agents = base_user_agents
 
         self.max_retries = 5
+        self.json_decoder = json_decoder or JsonDecoder()
 
-    def get_random_proxy(self):
-        """
-        Select a random proxy from the available pool.
-
-        :return: Proxy string
-        """
-
-        return random.choice(self.base_proxy)
-
-    def get_random_headers(self):
-        """
-        Generate request headers with a random user-agent.
-
-        :return: Updated HTTP headers
-        """
-
-        headers = self.base_headers.copy()
-        user_agent_with_chh = random.choice(self.base_user_agents)
-
-        headers.update(user_agent_with_chh)
-
-        return headers
-
-    def initialize_session(self):
-        """
-        Create and validate a requests session with retries.
-
-        :return: requests.Session object on success, False on failure
-        """
-
-        for attempt in range(self.max_retries):
-            try:
-                self.logger.info(f"Start creating session... Attempt:: {attempt}")
-                session = requests.Session()
-                session.headers.update(self.get_random_headers())
-
-                proxy = self.get_random_proxy()
-                session.proxies.update({
-                    'http':proxy,
-                    'https':proxy,
-                })
-
-                response = session.get(self.base_url, timeout=15)
-
-                if response.status_code != 200:
-                    raise Exception(f"Not available status code {response.status_code}")
-
-                return session
-
-            except Exception as e:
-                self.logger.error(f"Unexpected error on creating session {e}")
-                continue
-        else:
-            self.logger.error("Max retries expected...")
-            return False
+        self.session_pool = session_pool or SessionPool(
+            base_url=base_url,
+            base_headers=base_headers,
+            base_proxy=base_proxy,
+            base_user_agents=base_user_agents,
+            logger=logger
+        )
 
     def parse_categories(self, data: dict) -> list[dict]:
         """
@@ -116,30 +87,32 @@ class CategoryScraper:
         Retrieve all categories from the API endpoint.
 
         Workflow:
-        - Initialize a session
+        - Check out a warmed session from the pool
         - Request the category-tree endpoint
         - Parse categories into a flat list
 
         :return: List of categories or False if failed
         """
 
-        session = self.initialize_session()
-        if not session:
-            self.logger.error("Cannot get session...")
-            return False
-
         for attempt in range(self.max_retries):
+            pooled = self.session_pool.checkout()
+            if not pooled:
+                self.logger.error("Cannot get session...")
+                return False
+
+            status_code = None
             try:
                 self.logger.info(f"Try to get categories... Attempt:: {attempt} ")
 
                 url = self.base_url + 'ui-svc/v1/category-tree'
 
-                response = session.get(url, timeout=15)
+                response = pooled.session.get(url, timeout=15)
+                status_code = response.status_code
 
                 if response.status_code != 200:
                     raise Exception(f'Not allowed status code:: {response.status_code}')
 
-                data = response.json()
+                data = self.json_decoder.decode(response.content)
 
                 result = self.parse_categories(data)
 
@@ -152,4 +125,8 @@ class CategoryScraper:
 
             except Exception as e:
                 self.logger.error(f"Unexpected error on getting categories:: {e}")
-                sleep(random.uniform(1.5, 3.5))
+            finally:
+                self.session_pool.checkin(pooled, status_code)
+
+            # single request before workers start: nothing else to do, wait with backoff (session is returned)
+            sleep(get_backoff_delay(attempt))
@@ -0,0 +1,124 @@
+from typing import Any, Union
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+if msgspec is not None:
+    UNSET = msgspec.UNSET
+
+    class ListingStruct(msgspec.Struct):
+        """
+        Base of listing schema structs. Fields missing in the payload stay UNSET,
+        `get` and `[]` behave like on the decoded dictionary, so parse_product_data
+        reads structs and plain JSON the same way.
+        Unknown keys are skipped by the decoder without building python objects.
+        """
+
+        def get(self, key, default=None):
+            value = getattr(self, key, UNSET)
+            return default if value is UNSET else value
+
+        def __getitem__(self, key):
+            value = self.get(key, UNSET)
+            if value is UNSET:
+                raise KeyError(key)
+            return value
+
+    # leaf values are not coerced (API mixes strings and numbers), parsing converts them as before
+    Leaf = Union[Any, msgspec.UnsetType]
+
+    class Brand(ListingStruct):
+        name: Leaf = UNSET
+
+    class Image(ListingStruct):
+        l: Leaf = UNSET
+
+    class PrimPrice(ListingStruct):
+        sp: Leaf = UNSET
+
+    class Discount(ListingStruct):
+        mrp: Leaf = UNSET
+        prim_price: Union[PrimPrice, None, msgspec.UnsetType] = UNSET
+
+    class Pricing(ListingStruct):
+        discount: Union[Discount, None, msgspec.UnsetType] = UNSET
+
+    class Availability(ListingStruct):
+        avail_status: Leaf = UNSET
+
+    class Category(ListingStruct):
+        tlc_name: Leaf = UNSET
+        mlc_name: Leaf = UNSET
+        llc_name: Leaf = UNSET
+
+    class ParentInfo(ListingStruct):
+        created_on: Leaf = UNSET
+        updated_on: Leaf = UNSET
+
+    class Product(ListingStruct):
+        id: Leaf = UNSET
+        desc: Leaf = UNSET
+        brand: Union[Brand, None, msgspec.UnsetType] = UNSET
+        absolute_url: Leaf = UNSET
+        unit: Leaf = UNSET
+        magnitude: Leaf = UNSET
+        images: Union[list[Image], None, msgspec.UnsetType] = UNSET
+        pricing: Union[Pricing, None, msgspec.UnsetType] = UNSET
+        availability: Union[Availability, None, msgspec.UnsetType] = UNSET
+        is_best_value: Leaf = UNSET
+        sku_max_quantity: Leaf = UNSET
+        category: Union[Category, None, msgspec.UnsetType] = UNSET
+        parent_info: Union[ParentInfo, None, msgspec.UnsetType] = UNSET
+
+    class ProductInfo(ListingStruct):
+        number_of_pages: Leaf = UNSET
+        products: Union[list[Product], None, msgspec.UnsetType] = UNSET
+
+    class Tab(ListingStruct):
+        product_info: Union[ProductInfo, None, msgspec.UnsetType] = UNSET
+
+    class Listing(ListingStruct):
+        tabs: Union[list[Tab], None, msgspec.UnsetType] = UNSET
+
+
+class ListingDecoder:
+    """
+    Decoder of listing-svc responses into the listing schema (only fields used by
+    ProductsScraper.parse_product_data are materialized). Requires `msgspec`;
+    without it, or when a payload does not match the schema, the generic
+    JSON decoder is used.
+    """
+
+    def __init__(self, json_decoder, logger=None):
+        """
+        :param json_decoder: fallback decoder (JsonDecoder)
+        :param logger: logging.Logger instance
+        """
+
+        self.json_decoder = json_decoder
+        self.logger = logger
+
+        self.decoder = msgspec.json.Decoder(Listing) if msgspec is not None else None
+        if self.decoder is None and logger:
+            logger.warning(f'listing schema decoding requires msgspec :: falling back to {json_decoder}')
+
+    def decode(self, content):
+        """
+        Decode listing response.
+
+        :param content: raw response body (bytes)
+        :return: Listing struct OR decoded python object on fallback
+        """
+
+        if self.decoder is not None:
+            try:
+                return self.decoder.decode(content)
+            except msgspec.ValidationError as e:
+                # unexpected shape of a used field: generic decoding keeps per-product error handling
+                if self.logger:
+                    self.logger.warning(f'Listing does not match schema:: {e}')
+
+        return self.json_decoder.decode(content)
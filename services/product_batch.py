@@ -0,0 +1,361 @@
+import sys
+import math
+from array import array
+from pathlib import Path
+from collections.abc import Sequence
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    from services.product_record import ProductRecord
+except ImportError as ie:
+    exit(f"Cannot import ProductRecord:: {ie}")
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class DictionaryColumn:
+    """
+    Dictionary-encoded column: every distinct value is stored once,
+    rows keep integer codes (-1 is NULL).
+    """
+
+    def __init__(self):
+        self.values = []
+        self.index = {}
+        self.codes = array('l')
+
+    def get_code(self, value) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(-1 if value is None else self.get_code(value))
+
+    def extend(self, other: 'DictionaryColumn', rows=None):
+        """
+        Append codes of another column, translated into codes of this one.
+
+        :param other: DictionaryColumn
+        :param rows: optional list of selected rows of other column
+        """
+
+        mapping = [self.get_code(value) for value in other.values]
+        codes = other.codes if rows is None else (other.codes[row] for row in rows)
+        self.codes.extend(-1 if code < 0 else mapping[code] for code in codes)
+
+    def to_list(self) -> list:
+        values = self.values
+        return [None if code < 0 else values[code] for code in self.codes]
+
+    def __getitem__(self, row: int):
+        code = self.codes[row]
+        return None if code < 0 else self.values[code]
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.itemsize * len(self.codes) + sum(sys.getsizeof(value) for value in self.values)
+
+
+class ProductBatch(Sequence):
+    """
+    Columnar batch of parsed products (one listing page or a saving batch).
+    Numbers live in typed arrays (int64 ids and quantities, float64 prices with NaN as NULL,
+    int8 flags), repeated strings are dictionary-encoded and the rest are plain lists.
+    Rows are read as ProductRecord views, so a batch can be saved like a list of products;
+    writers aware of columns use `iter_rows`, `to_numpy` or `to_arrow` instead.
+    """
+
+    # column name -> array typecode
+    numeric_columns = {
+        'product_id': 'q',
+        'price_mrp': 'd',
+        'price_sp': 'd',
+        'discount_percent': 'd',
+        'is_best_value': 'b',
+        'available_quantity': 'q',
+    }
+
+    dictionary_columns = ('brand', 'unit', 'quantity_label', 'availability_code', 'category_main', 'category_mid', 'category_leaf', 'category_id', 'scraped_at')
+
+    # column order of ProductRecord
+    column_names = ProductRecord.__slots__
+
+    def __init__(self):
+        self.columns = {}
+        self.nulls = {}
+
+        for name in self.column_names:
+            if name in self.numeric_columns:
+                self.columns[name] = array(self.numeric_columns[name])
+                # rows with NULL in integer columns (float columns use NaN)
+                self.nulls[name] = set()
+            elif name in self.dictionary_columns:
+                self.columns[name] = DictionaryColumn()
+            else:
+                self.columns[name] = []
+
+    def convert_numeric(self, name: str, value):
+        """
+        Convert value to the type of a numeric column.
+
+        :param name: column name
+        :param value: python value or None
+        :return: tuple (converted value, is NULL)
+        """
+
+        typecode = self.numeric_columns[name]
+        if value is None:
+            return (math.nan if typecode == 'd' else 0), True
+        if typecode == 'd':
+            return float(value), False
+        if typecode == 'b':
+            return int(bool(value)), False
+        return int(value), False
+
+    def append(self, **values):
+        """
+        Append one product. Values are converted before any column is touched,
+        so a bad value leaves the batch unchanged.
+
+        :param values: product fields, missing fields are NULL
+        """
+
+        numeric = {name: self.convert_numeric(name, values.get(name)) for name in self.numeric_columns}
+
+        row = len(self)
+        for name, (value, is_null) in numeric.items():
+            self.columns[name].append(value)
+            if is_null and self.numeric_columns[name] != 'd':
+                self.nulls[name].add(row)
+
+        for name in self.column_names:
+            if name not in self.numeric_columns:
+                self.columns[name].append(values.get(name))
+
+    def extend(self, other: 'ProductBatch', skip: set = None):
+        """
+        Append rows of another batch column by column.
+
+        :param other: ProductBatch
+        :param skip: optional set of product ids; rows with these ids are skipped, appended ids are added to it
+        """
+
+        rows = None
+        if skip is not None:
+            rows = []
+            for row, product_id in enumerate(other.columns['product_id']):
+                if product_id not in skip:
+                    skip.add(product_id)
+                    rows.append(row)
+            if len(rows) == len(other):
+                rows = None
+
+        offset = len(self)
+        for name in self.column_names:
+            column, source = self.columns[name], other.columns[name]
+
+            if name in self.dictionary_columns:
+                column.extend(source, rows)
+            elif rows is None:
+                column.extend(source)
+            else:
+                column.extend(source[row] for row in rows)
+
+            nulls = other.nulls.get(name)
+            if nulls:
+                positions = enumerate(range(len(other)) if rows is None else rows)
+                self.nulls[name].update(offset + position for position, row in positions if row in nulls)
+
+    def get_value(self, name: str, row: int):
+        value = self.columns[name][row]
+
+        if name in self.numeric_columns:
+            typecode = self.numeric_columns[name]
+            if typecode == 'd':
+                return None if math.isnan(value) else value
+            if row in self.nulls[name]:
+                return None
+            if typecode == 'b':
+                return bool(value)
+
+        return value
+
+    def get_row(self, row: int) -> dict:
+        return {name: self.get_value(name, row) for name in self.column_names}
+
+    def get_column(self, name: str) -> list:
+        """
+        Python values of a whole column (NULL is None). Plain columns are returned as stored.
+
+        :param name: column name
+        :return: list of values, one per row
+        """
+
+        column = self.columns[name]
+
+        if name in self.dictionary_columns:
+            return column.to_list()
+
+        if name not in self.numeric_columns:
+            return column
+
+        typecode = self.numeric_columns[name]
+        if typecode == 'd':
+            return [None if value != value else value for value in column]
+
+        values = [bool(value) for value in column] if typecode == 'b' else column.tolist()
+        for row in self.nulls[name]:
+            values[row] = None
+        return values
+
+    def set_column(self, name: str, values):
+        """
+        Replace values of a plain (list) column, e.g. row hashes computed for the whole batch.
+
+        :param name: column name
+        :param values: iterable of values, one per row
+        """
+
+        values = list(values)
+        if len(values) != len(self):
+            raise ValueError(f'column {name} length {len(values)} != batch length {len(self)}')
+        self.columns[name] = values
+
+    def compute_discounts(self):
+        """
+        Discount percent of every row, `round((mrp - sp) / mrp * 100, 2)` where both prices are known and mrp > 0.
+        Computed over whole price arrays with numpy when it is installed.
+        """
+
+        price_mrp, price_sp = self.columns['price_mrp'], self.columns['price_sp']
+
+        if np is not None and len(self):
+            # zero-copy views of the price arrays
+            mrp = np.frombuffer(price_mrp, dtype=np.float64)
+            sp = np.frombuffer(price_sp, dtype=np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                discount = (mrp - sp) / mrp * 100
+                rounded = np.round(discount, 2)
+
+            # np.round scales by 100 and rounds half to even, round() rounds the exact decimal value;
+            # values close to a half cent are rounded by python, so row hashes do not depend on numpy
+            scaled = discount * 100
+            for row in np.flatnonzero(np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6):
+                rounded[row] = round(float(discount[row]), 2)
+
+            rounded[~((mrp > 0) & (sp != 0) & ~np.isnan(sp))] = np.nan
+            self.columns['discount_percent'] = array('d', rounded.tobytes())
+            del mrp, sp
+            return
+
+        self.columns['discount_percent'] = array('d', (
+            round((mrp - sp) / mrp * 100, 2) if mrp > 0 and sp == sp and sp != 0 else math.nan
+            for mrp, sp in zip(price_mrp, price_sp)
+        ))
+
+    def iter_rows(self, columns):
+        """
+        Row tuples of selected columns without building product records.
+
+        :param columns: column names
+        :return: iterator of tuples
+        """
+
+        return zip(*(self.get_column(name) for name in columns))
+
+    def to_numpy(self) -> dict:
+        """
+        Zero-copy numpy views of numeric columns and dictionary codes.
+        Views must be released before the batch is appended to.
+
+        :return: dictionary column name -> numpy array
+        """
+
+        if np is None:
+            raise ImportError('numpy is required for ProductBatch.to_numpy')
+
+        views = {name: np.frombuffer(column, dtype=column.typecode) for name, column in self.columns.items() if isinstance(column, array)}
+        for name in self.dictionary_columns:
+            views[name] = np.frombuffer(self.columns[name].codes, dtype=self.columns[name].codes.typecode)
+
+        return views
+
+    def to_arrow(self, schema=None):
+        """
+        Convert batch into a pyarrow RecordBatch; numeric buffers without NULLs are shared, not copied,
+        dictionary columns become DictionaryArrays. Shared buffers must be released before the batch is appended to.
+
+        :param schema: optional pyarrow schema to select and cast columns to (e.g. get_products_schema())
+        :return: pyarrow.RecordBatch
+        """
+
+        import pyarrow as pa
+
+        arrays = []
+        for name in self.column_names:
+            column = self.columns[name]
+
+            if name in self.numeric_columns:
+                typecode = self.numeric_columns[name]
+                has_nulls = bool(self.nulls.get(name)) or (typecode == 'd' and any(math.isnan(value) for value in column))
+                if typecode in ('q', 'd') and not has_nulls:
+                    arrow_type = pa.int64() if typecode == 'q' else pa.float64()
+                    arrays.append(pa.Array.from_buffers(arrow_type, len(column), [None, pa.py_buffer(column)]))
+                else:
+                    arrays.append(pa.array([self.get_value(name, row) for row in range(len(self))]))
+            elif name in self.dictionary_columns:
+                codes = pa.array([None if code < 0 else code for code in column.codes], type=pa.int32())
+                arrays.append(pa.DictionaryArray.from_arrays(codes, pa.array(column.values)))
+            else:
+                arrays.append(pa.array(column))
+
+        batch = pa.RecordBatch.from_arrays(arrays, names=list(self.column_names))
+        return batch.select(schema.names).cast(schema) if schema is not None else batch
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError('batch index out of range')
+
+        return ProductRecord(**self.get_row(row))
+
+    def __len__(self):
+        return len(self.columns['product_id'])
+
+    @property
+    def batch_size(self) -> int:
+        """
+        Number of products, counted by saving thread against save_result_limit.
+        """
+
+        return len(self)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Estimated memory of the batch for results queue byte budget.
+        """
+
+        size = sys.getsizeof(self)
+        for column in self.columns.values():
+            if isinstance(column, array):
+                size += column.itemsize * len(column)
+            elif isinstance(column, DictionaryColumn):
+                size += column.nbytes
+            else:
+                size += sys.getsizeof(column) + sum(sys.getsizeof(value) for value in column)
+        return size
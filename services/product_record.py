@@ -0,0 +1,91 @@
+import sys
+from collections.abc import Mapping
+
+
+def intern_text(value):
+    """
+    Intern repeated short strings (brands, units, category names),
+    so every product refers to one shared string object.
+
+    :param value: string or any other value
+    :return: interned string or value unchanged
+    """
+
+    return sys.intern(value) if type(value) is str else value
+
+
+class ProductRecord(Mapping):
+    """
+    Compact product record built by ProductsScraper.parse_product_data.
+    Values live in slots instead of a per-product dict; read-only mapping
+    protocol (keys, get, [], items) keeps it a drop-in replacement for the
+    product dictionary in results queue, saving batches and DB writers.
+    """
+
+    __slots__ = (
+        'product_id',
+        'name',
+        'brand',
+        'product_url',
+        'images',
+        'unit',
+        'quantity_label',
+        'price_mrp',
+        'price_sp',
+        'discount_percent',
+        'is_best_value',
+        'available_quantity',
+        'availability_code',
+        'category_main',
+        'category_mid',
+        'category_leaf',
+        'created_at_on_web_site',
+        'updated_at_on_web_site',
+        'category_id',
+        'scraped_at',
+        'row_hash',
+    )
+
+    # strings repeated across many products
+    interned_fields = ('brand', 'unit', 'quantity_label', 'availability_code', 'category_main', 'category_mid', 'category_leaf')
+
+    def __init__(self, **values):
+        """
+        :param values: field values, missing fields are None
+        """
+
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+        for field in self.interned_fields:
+            setattr(self, field, intern_text(getattr(self, field)))
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __repr__(self):
+        return f'ProductRecord({self.product_id}, {self.name!r})'
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Estimated memory of the record for results queue byte budget
+        (interned strings are shared, so they are not counted).
+        """
+
+        size = sys.getsizeof(self) + sys.getsizeof(self.name) + sys.getsizeof(self.product_url) + sys.getsizeof(self.images)
+        for image in self.images or ():
+            size += sys.getsizeof(image)
+        return size
@@ -1,10 +1,10 @@
 import sys
-from logging import exception
+import json
+import hashlib
+from array import array
+from datetime import datetime
 from pathlib import Path
-import random
-from time import sleep
-
-import requests
+from time import monotonic
 
 sys.path.append(str(Path(__file__).parent.parent))
 
@@ -13,14 +13,80 @@ try:
 except ImportError as ie:
     exit(f"Cannot import ThreadingBase:: {ie}")
 
+try:
+    from core.network.session_pool import SessionPool
+except ImportError as ie:
+    exit(f"Cannot import SessionPool:: {ie}")
+
+try:
+    from core.task_destribution.priority_queue import PriorityTaskQueue
+except ImportError as ie:
+    exit(f"Cannot import PriorityTaskQueue:: {ie}")
+
+try:
+    from services.product_record import ProductRecord
+except ImportError as ie:
+    exit(f"Cannot import ProductRecord:: {ie}")
+
+try:
+    from services.product_batch import ProductBatch
+except ImportError as ie:
+    exit(f"Cannot import ProductBatch:: {ie}")
+
+try:
+    from core.network.json_decoder import JsonDecoder
+except ImportError as ie:
+    exit(f"Cannot import JsonDecoder:: {ie}")
+
+try:
+    from services.listing_schema import ListingDecoder
+except ImportError as ie:
+    exit(f"Cannot import ListingDecoder:: {ie}")
+
 class ProductsScraper(ThreadingBase):
     """
     Scraper class for extracting products from BigBasket.
-    Uses multi-threaded execution, session handling with proxies,
+    Uses multi-threaded execution, shared session pool with proxies,
     and stores results into a database queue for batch saving.
     """
 
-    def __init__(self,base_url:str, base_headers:dict, base_proxy:list, base_user_agents:list, logger, th_num: int, db, save_result_limit:int):
+    # existing product keeps price_changed_at unless price or availability differs
+    price_changed_expression = (
+        "CASE WHEN ROW(products.price_mrp, products.price_sp, products.available_quantity, products.availability_code) "
+        "IS DISTINCT FROM ROW(excluded.price_mrp, excluded.price_sp, excluded.available_quantity, excluded.availability_code) "
+        "THEN CURRENT_TIMESTAMP ELSE products.price_changed_at END"
+    )
+
+    # upsert outcome of every inserted or changed product
+    upsert_returning = "product_id, (xmax = 0) AS inserted, price_changed_at = CURRENT_TIMESTAMP AS price_changed"
+
+    def __init__(
+            self,
+            base_url: str,
+            base_headers: dict,
+            base_proxy: list,
+            base_user_agents: list,
+            logger,
+            th_num: int,
+            db,
+            save_result_limit: int,
+            session_pool: SessionPool = None,
+            concurrency_controller=None,
+            retry_queue=None,
+            save_max_latency: float = 5,
+            results_max_items: int = 0,
+            results_max_bytes: int = 0,
+            bulk_save: bool = False,
+            price_history_partition: str = None,
+            run_id: str = None,
+            resume: bool = False,
+            task_queue=None,
+            longest_first: bool = False,
+            seen_index=None,
+            columnar_batch: bool = False,
+            json_decoder: JsonDecoder = None,
+            listing_schema: bool = False
+    ):
         """
         Initialize products scraper with base configuration.
 
@@ -32,9 +98,33 @@ class ProductsScraper(ThreadingBase):
         :param th_num: Number of threads to use for scraping
         :param db: Database handler for saving results
         :param save_result_limit: Maximum batch size for saving results
+        :param session_pool: Shared pool of warmed sessions (a private one is created if not provided)
+        :param concurrency_controller: Optional AIMDController adjusting number of active workers
+        :param retry_queue: Optional RetryQueue with custom backoff and retry budget
+        :param save_max_latency: Maximum age in seconds of a not full saving batch
+        :param results_max_items: Maximum number of queued results (0 - unlimited)
+        :param results_max_bytes: Maximum estimated size of queued results in bytes (0 - unlimited)
+        :param bulk_save: Save batches with COPY based bulk upsert
+        :param price_history_partition: Append price snapshots into daily ('day') or monthly ('month') partitions, None disables history
+        :param run_id: Identifier of the run used for page checkpoints, None disables checkpoints
+        :param resume: Skip pages already completed by the run with `run_id`
+        :param task_queue: Optional shared tasks queue (PostgresTaskQueue) for multi-node runs
+        :param longest_first: Order tasks by category page count (largest first) instead of shuffling; ignored with shared tasks queue
+        :param seen_index: Optional run-scoped index of parsed product ids (products seen in another category are skipped)
+        :param columnar_batch: Queue every parsed page as one columnar ProductBatch instead of per-product records
+        :param json_decoder: Decoder of response bodies (fastest installed backend if not provided)
+        :param listing_schema: Decode listing pages into msgspec structs with only the used fields
         """
 
-        super().__init__(logger=logger, th_num=th_num)
+        super().__init__(
+            logger=logger,
+            th_num=th_num,
+            concurrency_controller=concurrency_controller,
+            retry_queue=retry_queue,
+            results_max_items=results_max_items,
+            results_max_bytes=results_max_bytes,
+            task_queue=task_queue if task_queue is not None or not longest_first else PriorityTaskQueue(key=self.get_task_priority)
+        )
 
         self.base_url = base_url
         self.api_base_url = f"{self.base_url}listing-svc/v2/products"
@@ -43,104 +133,53 @@ class ProductsScraper(ThreadingBase):
         self.base_user_agents = base_user_agents
         self.db = db
         self.save_result_limit = save_result_limit
+        self.save_max_latency = save_max_latency
+        self.bulk_save = bulk_save
+        self.price_history_partition = price_history_partition
+
+        # crash-safe progress: completed (category id, page) work units of the run
+        self.run_id = run_id
+        self.resume = resume
+        self.completed_pages = set()
 
         self.max_retries = 5
+        self.json_decoder = json_decoder or JsonDecoder()
+        self.listing_decoder = ListingDecoder(self.json_decoder, logger) if listing_schema else self.json_decoder
         self.on_conflict_stmt = None
 
-    def get_random_proxy(self):
-        """
-        Select a random proxy from the proxy pool.
+        # per-category statistics of the run: pages, ids of listed products (before deduplication),
+        # new products (credited to the category that saved them) and ids of products with changed price/availability
+        self.category_pages = {}
+        self.category_products = {}
+        self.category_new_products = {}
+        self.changed_product_ids = set()
 
-        :return: Proxy string
-        """
+        # page counts of categories from previous runs (longest-job-first ordering)
+        self.longest_first = longest_first
+        self.known_pages = {}
 
-        return random.choice(self.base_proxy)
+        # products already parsed during the run and duplicates per category: [parsed, duplicates]
+        self.seen_index = seen_index
+        self.category_duplicates = {}
 
-    def get_random_headers(self):
-        """
-        Generate request headers with a random user-agent.
-
-        :return: Updated HTTP headers
-        """
-
-        headers = self.base_headers.copy()
-        user_agent_with_chh = random.choice(self.base_user_agents)
-
-        headers.update(user_agent_with_chh)
-
-        return headers
+        # parsed page is queued as one columnar batch
+        self.columnar_batch = columnar_batch
 
-    def initialize_session(self):
-        """
-        Create and validate a requests session with retries.
-
-        :return: requests.Session object on success, False on failure
-        """
-
-        for attempt in range(self.max_retries):
-            try:
-                self.logger.info(f"Start creating session... Attempt:: {attempt}")
-                session = requests.Session()
-                session.headers.update(self.get_random_headers())
-
-                proxy = self.get_random_proxy()
-                session.proxies.update({
-                    'http': proxy,
-                    'https': proxy,
-                })
-
-                response = session.get(self.base_url, timeout=15)
-
-                if response.status_code != 200:
-                    raise Exception(f"Not available status code {response.status_code}")
-
-                return session
-
-            except Exception as e:
-                self.logger.error(f"Unexpected error on creating session {e}")
-                continue
-        else:
-            self.logger.error("Max retries expected...")
-            return False
-
-    def scraping_consumer(self, method):
-        """
-        Single thread worker for processing product tasks.
-
-        :param method: Function to process each task
-        :return: False if session cannot be created, otherwise None
-        """
-
-        session = self.initialize_session()
-        if not session:
-            self.logger.info("Cannot create session... Exiting")
-            return False
-
-        try:
-            while self.tasks.qsize() != 0 and not self.is_stopped:
-                try:
-                    self.block.acquire()
-                    task = self.tasks.get(timeout=0.1)
-                    method(task, session)
-                except Empty:
-                    self.logger.info(f'task queue is empty')
-                    break
-                except Exception as e:
-                    self.logger.error(f'consumer exception occurred:: {e}')
-                    break
-                finally:
-                    self.block.release()
-
-        finally:
-            session.close()
-        self.logger.info(f'consumer finished procession')
+        self.session_pool = session_pool or SessionPool(
+            base_url=base_url,
+            base_headers=base_headers,
+            base_proxy=base_proxy,
+            base_user_agents=base_user_agents,
+            logger=logger
+        )
 
     @ThreadingBase.exception
-    def parse_product_data(self, data):
+    def parse_product_data(self, data, category_id=None):
         """
         Extract product details from API response and store into results queue.
 
-        :param data: JSON response from product listing endpoint
+        :param data: JSON response from product listing endpoint (decoded dictionary or Listing struct)
+        :param category_id: Id of the scraped category (products are tagged for per-category statistics)
         :return: Number of pages for pagination or False if parsing fails
         """
 
@@ -151,6 +190,13 @@ class ProductsScraper(ThreadingBase):
         count_of_pages = product_info.get('number_of_pages', 1)
         products = product_info.get('products')
 
+        # fetch time of the page, used by price history partitions however late the batch is saved
+        scraped_at = datetime.now()
+
+        batch = ProductBatch() if self.columnar_batch else None
+
+        parsed, duplicates = 0, 0
+        listed_ids = array('q')
         for product in products:
             try:
                 product_id = int(product.get('id', 0))
@@ -158,6 +204,13 @@ class ProductsScraper(ThreadingBase):
                 if not product_id:
                     continue
 
+                # product listed in several categories is saved once per run
+                parsed += 1
+                listed_ids.append(product_id)
+                if self.seen_index is not None and not self.seen_index.add(product_id):
+                    duplicates += 1
+                    continue
+
                 name = product.get('desc', '')
                 brand = product.get('brand', {}).get('name', '')
                 product_url = product.get('absolute_url', '')
@@ -184,8 +237,8 @@ class ProductsScraper(ThreadingBase):
                 if discount_info.get('prim_price', {}).get('sp'):
                     price_sp = float(discount_info['prim_price']['sp']) / 100
 
-                # Calculate discount percentage if both prices available
-                if price_mrp and price_sp and price_mrp > 0:
+                # Calculate discount percentage if both prices available (columnar batch computes it for the whole page)
+                if batch is None and price_mrp and price_sp and price_mrp > 0:
                     discount_percent = round(((price_mrp - price_sp) / price_mrp) * 100, 2)
 
                 # Extract availability info
@@ -205,27 +258,36 @@ class ProductsScraper(ThreadingBase):
                 created_on_website = parent_info.get('created_on', None)
                 updated_on_website = parent_info.get('updated_on', None)
 
-                # Prepare the result dictionary
-                result = {
-                    'product_id': product_id,
-                    'name': name,
-                    'brand': brand,
-                    'product_url': product_url,
-                    'images': images,
-                    'unit': unit,
-                    'quantity_label': quantity_label,
-                    'price_mrp': price_mrp,
-                    'price_sp': price_sp,
-                    'discount_percent': discount_percent,
-                    'is_best_value': is_best_value,
-                    'available_quantity': available_quantity,
-                    'availability_code': availability_code,
-                    'category_main': category_main,
-                    'category_mid': category_mid,
-                    'category_leaf': category_leaf,
-                    'created_at_on_web_site': created_on_website,
-                    'updated_at_on_web_site': updated_on_website
-                }
+                values = dict(
+                    product_id=product_id,
+                    name=name,
+                    brand=brand,
+                    product_url=product_url,
+                    images=images,
+                    unit=unit,
+                    quantity_label=quantity_label,
+                    price_mrp=price_mrp,
+                    price_sp=price_sp,
+                    discount_percent=discount_percent,
+                    is_best_value=is_best_value,
+                    available_quantity=available_quantity,
+                    availability_code=availability_code,
+                    category_main=category_main,
+                    category_mid=category_mid,
+                    category_leaf=category_leaf,
+                    created_at_on_web_site=created_on_website,
+                    updated_at_on_web_site=updated_on_website,
+                    category_id=category_id,
+                    scraped_at=scraped_at
+                )
+
+                if batch is not None:
+                    batch.append(**values)
+                    continue
+
+                # Prepare the compact product record
+                result = ProductRecord(**values)
+                result.row_hash = self.get_row_hash(result)
 
                 self.results.put(result)
 
@@ -234,80 +296,334 @@ class ProductsScraper(ThreadingBase):
                 self.logger.error(f"Unexpected error on parsing product {e}")
                 continue
 
+        if batch:
+            batch.compute_discounts()
+            batch.set_column('row_hash', (self.get_row_hash(dict(zip(batch.column_names, values))) for values in batch.iter_rows(batch.column_names)))
+            self.results.put(batch)
+
+        with self.counter_lock:
+            counters = self.category_duplicates.setdefault(category_id, [0, 0])
+            counters[0] += parsed
+            counters[1] += duplicates
+            self.category_products.setdefault(category_id, array('q')).extend(listed_ids)
+
         return count_of_pages
 
-    @ThreadingBase.progress_logger
+    # product columns copied into price history snapshots
+    price_history_columns = ('product_id', 'scraped_at', 'price_mrp', 'price_sp', 'discount_percent', 'available_quantity', 'availability_code')
+
+    # not scraped content: category_id depends on which category reached the product first, scraped_at changes every run
+    row_hash_excluded_keys = ('row_hash', 'category_id', 'scraped_at')
+
+    @classmethod
+    def get_row_hash(cls, result) -> str:
+        """
+        Hash of scraped product content, used to skip upserts of unchanged products.
+
+        :param result: Product record (or dictionary)
+        :return: Hex digest string
+        """
+
+        content = json.dumps({key: value for key, value in result.items() if key not in cls.row_hash_excluded_keys}, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+    def get_page_tasks(self, task: dict, number_of_pages: int) -> list[dict]:
+        """
+        Build independent work units for the remaining pages of a category.
+        Pages completed before a crash are skipped when resuming.
+
+        :param task: Category task of the first page
+        :param number_of_pages: Number of pages returned by the first page
+        :return: List of page tasks (pages 2..number_of_pages)
+        """
+
+        return [
+            {**task, 'page': page, 'attempt': 0}
+            for page in range(2, number_of_pages + 1)
+            if (task.get('id'), page) not in self.completed_pages
+        ]
+
+    def mark_page_completed(self, task: dict, number_of_pages: int = None):
+        """
+        Queue a page checkpoint behind the page products, so saver stores it after them.
+
+        :param task: Page task
+        :param number_of_pages: Number of pages of the category (known after parsing)
+        """
+
+        if not self.run_id:
+            return
+
+        self.results.put({
+            'checkpoint': {
+                'run_id': self.run_id,
+                'category_id': task.get('id'),
+                'page': task.get('page', 1),
+                'number_of_pages': number_of_pages,
+            }
+        })
+
+    def get_resume_tasks(self, tasks: list[dict]) -> list[dict]:
+        """
+        Load checkpoints of the run and rebuild work units which are not completed yet:
+        categories with completed first page get their remaining pages directly,
+        other categories start from the first page again.
+
+        :param tasks: Category tasks
+        :return: List of tasks to process OR False if checkpoints cannot be loaded
+        """
+
+        checkpoints = self.db.get_checkpoints(self.run_id)
+        if checkpoints is False:
+            return False
+
+        number_of_pages = {}
+        for checkpoint in checkpoints:
+            self.completed_pages.add((checkpoint['category_id'], checkpoint['page']))
+            if checkpoint['page'] == 1:
+                number_of_pages[checkpoint['category_id']] = checkpoint['number_of_pages'] or 1
+
+        resume_tasks = []
+        for task in tasks:
+            category_id = task.get('id')
+            if category_id in number_of_pages:
+                resume_tasks.extend(self.get_page_tasks(task, number_of_pages[category_id]))
+            else:
+                resume_tasks.append(task)
+
+        self.logger.info(f"Resuming run {self.run_id}:: completed pages:: {len(self.completed_pages)} :: tasks left:: {len(resume_tasks)}")
+        return resume_tasks
+
+    def update_category_stats(self, to_save: list[dict], rows: list[dict]):
+        """
+        Collect price/availability changed products and count new products per saving category.
+
+        :param to_save: Saved product dictionaries
+        :param rows: Rows returned by upsert (unchanged products are not returned)
+        """
+
+        inserted = {row['product_id'] for row in rows if row['inserted']}
+        self.changed_product_ids.update(row['product_id'] for row in rows if row['price_changed'])
+
+        if isinstance(to_save, ProductBatch):
+            products = zip(to_save.get_column('product_id'), to_save.get_column('category_id'))
+        else:
+            products = ((product['product_id'], product.get('category_id')) for product in to_save)
+
+        for product_id, category_id in products:
+            self.category_new_products[category_id] = self.category_new_products.get(category_id, 0) + (product_id in inserted)
+
+    def log_duplicates_summary(self, top: int = 10):
+        """
+        Log share of products already parsed in other categories, overall and for top categories.
+
+        :param top: Number of categories with highest duplicate ratio to log
+        """
+
+        if self.seen_index is None:
+            return
+
+        parsed = sum(counters[0] for counters in self.category_duplicates.values())
+        duplicates = sum(counters[1] for counters in self.category_duplicates.values())
+        self.logger.info(f"Duplicate products:: {duplicates}/{parsed} ({round(duplicates / parsed * 100, 2) if parsed else 0}%) :: unique:: {len(self.seen_index)} :: index size:: {self.seen_index.nbytes} bytes")
+
+        ratios = sorted(
+            ((counters[1] / counters[0], category_id, counters) for category_id, counters in self.category_duplicates.items() if counters[1]),
+            key=lambda item: item[0],
+            reverse=True
+        )
+        for ratio, category_id, counters in ratios[:top]:
+            self.logger.info(f"Duplicate products in category {category_id}:: {counters[1]}/{counters[0]} ({round(ratio * 100, 2)}%)")
+
+    def save_category_stats(self):
+        """
+        Store statistics of categories visited during the run.
+        Products and changed products count every product listed in the category, also the ones
+        deduplicated into another category, so scheduler input does not depend on which category
+        reached a product first. New products are credited to the category that saved them.
+
+        :return: True if saved successfully, False otherwise
+        """
+
+        rows = []
+        for category_id in set(self.category_pages) | set(self.category_products) | set(self.category_new_products):
+            if category_id is None:
+                continue
+
+            listed_ids = self.category_products.get(category_id, ())
+            rows.append({
+                'category_id': category_id,
+                'run_id': self.run_id or '',
+                'number_of_pages': self.category_pages.get(category_id),
+                'products': len(listed_ids),
+                'new_products': self.category_new_products.get(category_id, 0),
+                'changed_products': sum(product_id in self.changed_product_ids for product_id in listed_ids),
+                'duplicate_products': self.category_duplicates.get(category_id, [0, 0])[1],
+            })
+
+        if not rows:
+            return True
+
+        return self.db.save_category_stats(rows)
+
+    def get_task_priority(self, task: dict) -> tuple:
+        """
+        Longest-job-first priority of a task (lower is taken first):
+        first pages of categories with unknown size go first as a quick probe pass,
+        then pages of larger categories before smaller ones, lower pages first.
+
+        :param task: Page task
+        :return: Sortable priority
+        """
+
+        category_id = task.get('id')
+        page = task.get('page', 1)
+
+        pages = self.category_pages.get(category_id) or self.known_pages.get(category_id)
+        if not pages:
+            return 0, 0, page
+
+        return 1, -pages, page
+
     @ThreadingBase.exception
-    def scraping_executor(self, task: dict, session: requests.Session):
+    def run(self, tasks):
         """
-        Execute product scraping for a single category.
+        Run products scraping, skipping pages completed by the resumed run.
 
-        :param task: Dictionary containing category info (type, slug, id, name)
-        :param session: Active requests.Session object
-        :return: True on successful processing
+        :param tasks: List of category tasks
+        :return: True on success, False on failure
+        """
+
+        if self.run_id and self.resume:
+            tasks = self.get_resume_tasks(tasks)
+            if tasks is False:
+                self.logger.critical(f"Cannot load checkpoints of run {self.run_id}")
+                return False
+
+        if self.longest_first:
+            category_stats = self.db.get_category_stats()
+            if category_stats is False:
+                self.logger.error(f"Cannot get category page counts, unknown categories are probed first")
+            else:
+                self.known_pages = {category_id: stats['number_of_pages'] for category_id, stats in category_stats.items() if stats['number_of_pages']}
+            self.logger.info(f"Longest-job-first ordering:: known page counts:: {len(self.known_pages)} / {len(tasks)} categories")
+
+        result = super().run(tasks)
+
+        self.log_duplicates_summary()
+        if not self.save_category_stats():
+            self.logger.error(f"Failed to save category statistics")
+
+        return result
+
+    @ThreadingBase.progress_logger
+    @ThreadingBase.exception
+    def scraping_executor(self, task: dict):
+        """
+        Execute product scraping for a single page of a category.
+        The first page fans out the remaining pages as separate tasks,
+        so any worker can pick them up. Each attempt checks a warmed session
+        out of the shared pool and returns it with the response status.
+        A failed attempt is moved to retry queue with backoff instead of sleeping.
+
+        :param task: Dictionary containing category info (type, slug, id, name), optional page and attempt
+        :return: True on successful processing, retry_marker if retry is scheduled, False if all retries failed
         """
 
         type_ = task.get("type")
         slug = task.get("slug")
         category_name = task.get("category_name")
         category_id = task.get('id')
+        page = task.get('page', 1)
 
-        self.logger.info(f"Starting processing:: {category_id}::{category_name}")
+        self.logger.info(f"Starting processing:: {category_id}::{category_name}::{page}")
 
-        page = 1
-        last_page = 2
         params = {
             'type': type_,
             'slug': slug,
+            'page': f"{page}",
         }
 
-        while page <= last_page:
-            for attempt in range(self.max_retries):
-                try:
-                    params['page'] = f"{page}"
-
-                    response = session.get(self.api_base_url, params=params, timeout=15)
-                    if response.status_code == 204:
-                        break
+        attempt = task.get('attempt', 0)
+        if attempt == 0:
+            self.retry_queue.record_attempt()
 
-                    if response.status_code != 200:
-                        raise Exception(f"Not allowed status code:: {response.status_code}")
+        pooled = self.session_pool.checkout()
+        if not pooled:
+            self.logger.error(f"Cannot get session for {category_id}::{category_name}::{page}")
+            return self.schedule_retry(task, self.max_retries)
 
+        status_code = None
+        started_at = monotonic()
+        try:
+            response = pooled.session.get(self.api_base_url, params=params, timeout=15)
+            status_code = response.status_code
+            self.report_response(status_code, monotonic() - started_at)
+            if response.status_code == 204:
+                self.logger.info(f"No content for {category_id}::{category_name}::{page}")
+                self.mark_page_completed(task)
+                return True
+
+            if response.status_code != 200:
+                raise Exception(f"Not allowed status code:: {response.status_code}")
+
+            data = self.listing_decoder.decode(response.content)
+
+            last_page = self.parse_product_data(data, category_id)
+            del data
+
+            if not isinstance(last_page, int):
+                raise Exception(f"Cannot parse count of pages")
+
+            self.logger.info(f"Successfully parsed {page}/{last_page} for category {category_id}::{category_name}")
+
+            if page == 1:
+                self.category_pages[category_id] = last_page
+                if last_page > 1:
+                    self.add_tasks(self.get_page_tasks(task, last_page))
+
+            self.mark_page_completed(task, last_page)
+            return True
+        except Exception as e:
+            self.logger.error(f"Attempt:: {attempt}:: Unexpected error on {category_id}::{category_name}::{page}:  {e}")
+            # network errors and timeouts are congestion signals as well
+            if status_code is None:
+                self.report_response(None)
+        finally:
+            self.session_pool.checkin(pooled, status_code)
 
-                    data = response.json()
-
-                    last_page = self.parse_product_data(data)
-                    del data
-
-                    if not isinstance(last_page, int):
-                        raise Exception(f"Cannot parse count of pages")
-
-                    self.logger.info(f"Successfully parsed {page}/{last_page} for category {category_id}::{category_name}")
-                    break
-                except Exception as e:
-                    self.logger.error(f"Attempt:: {attempt}:: Unexpected error on {category_id}::{category_name}::{page}:  {e}")
-                    sleep(random.uniform(1.5, 3.5))
-            else:
-                self.logger.error(f"Max retries occupied for {category_id}::{category_name}::{page}")
-
-            page += 1
-
-        self.logger.info(f"Successfully parsed category {category_id}::{category_name}")
-        return True
+        # failed page waits in retry queue, worker moves on to other ready tasks
+        result = self.schedule_retry(task, self.max_retries)
+        if result is False:
+            self.logger.error(f"Max retries occupied for {category_id}::{category_name}::{page}")
+        return result
 
     @ThreadingBase.exception
     def saving_executor(self, results):
         """
         Save scraped product results into the database with conflict handling.
+        Page checkpoints in the batch are stored only after products of the batch are saved.
 
-        :param results: List of product dictionaries to save
+        :param results: List of product dictionaries (and page checkpoints) to save
         :return: True if saved successfully, False otherwise
         """
 
         unique_ids = set()
         to_save = []
+        checkpoints = []
+        batch = None
 
         for result in results:
+            # columnar page batches are merged into one saving batch
+            if isinstance(result, ProductBatch):
+                batch = batch if batch is not None else ProductBatch()
+                batch.extend(result, skip=unique_ids)
+                continue
+
+            if 'checkpoint' in result:
+                checkpoints.append(result['checkpoint'])
+                continue
+
             product_id = result.get('product_id')
             if product_id not in unique_ids:
                 unique_ids.add(product_id)
@@ -315,6 +631,26 @@ class ProductsScraper(ThreadingBase):
 
         del results
 
+        for products in (to_save, batch):
+            if products and not self.save_products_batch(products):
+                return False
+
+        del to_save, batch
+
+        # a failed checkpoint only means the page is scraped again on resume
+        if checkpoints and not self.db.save_checkpoints(checkpoints):
+            self.logger.error(f"Failed to save checkpoints:: {len(checkpoints)} pages")
+
+        return True
+
+    def save_products_batch(self, to_save):
+        """
+        Upsert unique products of a batch and append their price history.
+
+        :param to_save: List of unique product dictionaries OR ProductBatch
+        :return: True if saved successfully, False otherwise
+        """
+
         if self.on_conflict_stmt is None:
             keys = list(to_save[0].keys())
             keys.remove('product_id')
@@ -322,8 +658,33 @@ class ProductsScraper(ThreadingBase):
             self.on_conflict_stmt = self.db.prepare_statement(
                 update_keys=keys,
                 conflict_key="product_id",
-                updated_at = "CURRENT_TIMESTAMP"
+                change_key="row_hash",
+                table_name="bigbasket.products",
+                updated_at = "CURRENT_TIMESTAMP",
+                price_changed_at = self.price_changed_expression
             )
-        result = self.db.save_products(to_save, self.on_conflict_stmt)
-        del to_save
-        return result
+        rows = self.db.save_products(to_save, self.on_conflict_stmt, bulk=self.bulk_save, returning=self.upsert_returning)
+
+        # None: cursor decorator failed before the query (e.g. no connection)
+        if rows is False or rows is None:
+            return False
+
+        result = self.db.get_upsert_counts(rows, len(to_save))
+        self.logger.info(f"Batch saved:: inserted:: {result['inserted']} :: updated:: {result['updated']} :: unchanged:: {result['unchanged']}")
+
+        self.update_category_stats(to_save, rows)
+
+        if self.price_history_partition:
+            if isinstance(to_save, ProductBatch):
+                values = to_save.iter_rows(self.price_history_columns)
+            else:
+                values = ([product[name] for name in self.price_history_columns] for product in to_save)
+
+            history = [dict(zip(self.price_history_columns, row)) for row in values]
+
+            if not self.db.save_price_history(history, partition=self.price_history_partition):
+                self.logger.error(f"Failed to append price history:: {len(history)} rows")
+
+            del history
+
+        return True
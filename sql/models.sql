@@ -1,4 +1,4 @@
-CREATE SCHEMA IF NOT EXISTS bigbasket
+CREATE SCHEMA IF NOT EXISTS bigbasket;
 
 CREATE TABLE IF NOT EXISTS bigbasket.products (
     product_id BIGINT PRIMARY KEY,
@@ -24,6 +24,81 @@ CREATE TABLE IF NOT EXISTS bigbasket.products (
     created_at_on_web_site TIMESTAMP,
     updated_at_on_web_site TIMESTAMP,
 
+    -- hash of scraped content, unchanged products are not rewritten on upsert
+    row_hash TEXT,
+
+    -- leaf category the product was scraped from, last price/availability change
+    category_id BIGINT,
+    price_changed_at TIMESTAMP,
+
+    -- fetch time of the listing page the stored content comes from
+    scraped_at TIMESTAMP,
+
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP
 );
+
+ALTER TABLE bigbasket.products ADD COLUMN IF NOT EXISTS row_hash TEXT;
+ALTER TABLE bigbasket.products ADD COLUMN IF NOT EXISTS category_id BIGINT;
+ALTER TABLE bigbasket.products ADD COLUMN IF NOT EXISTS price_changed_at TIMESTAMP;
+ALTER TABLE bigbasket.products ADD COLUMN IF NOT EXISTS scraped_at TIMESTAMP;
+
+-- append-only price snapshots, one range partition per day (or month);
+-- partitions are created by the scraper, retention drops old partitions
+CREATE TABLE IF NOT EXISTS bigbasket.price_history (
+    product_id BIGINT NOT NULL,
+    scraped_at TIMESTAMP NOT NULL,
+
+    price_mrp FLOAT,
+    price_sp FLOAT,
+    discount_percent FLOAT,
+
+    available_quantity INTEGER,
+    availability_code TEXT
+) PARTITION BY RANGE (scraped_at);
+
+CREATE INDEX IF NOT EXISTS price_history_product_id_idx ON bigbasket.price_history (product_id, scraped_at);
+
+-- completed (category, page) work units of a run, used by --resume
+CREATE TABLE IF NOT EXISTS bigbasket.scrape_checkpoints (
+    run_id TEXT NOT NULL,
+    category_id BIGINT NOT NULL,
+    page INTEGER NOT NULL,
+    number_of_pages INTEGER,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, category_id, page)
+);
+
+-- shared tasks queue of distributed runs: claimed with FOR UPDATE SKIP LOCKED,
+-- visible_at is the retry time of pending tasks and the claim deadline (extended by heartbeats) of claimed ones
+CREATE TABLE IF NOT EXISTS bigbasket.task_queue (
+    id BIGSERIAL PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    visible_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP,
+    UNIQUE (run_id, task_key)
+);
+
+CREATE INDEX IF NOT EXISTS task_queue_visible_idx ON bigbasket.task_queue (run_id, visible_at) WHERE status <> 'done';
+
+-- per-category statistics of every run, used by incremental recrawl scheduling
+CREATE TABLE IF NOT EXISTS bigbasket.category_stats (
+    category_id BIGINT NOT NULL,
+    run_id TEXT NOT NULL,
+    number_of_pages INTEGER,
+    products INTEGER,
+    new_products INTEGER,
+    changed_products INTEGER,
+    -- products skipped because they were already parsed in another category
+    duplicate_products INTEGER,
+    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (category_id, run_id)
+);
+
+ALTER TABLE bigbasket.category_stats ADD COLUMN IF NOT EXISTS duplicate_products INTEGER;